@@ -1,27 +1,59 @@
+import asyncio
+import base64
+import contextlib
+import functools
 import json
 import os
+import queue
 import shutil
 import threading
 import tkinter as tk
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
-import geopandas as gpd
+import numpy as np
 import pandas as pd
 import ttkbootstrap as tb
 import us
 from tkinter import filedialog, messagebox
 
 from .core.apportionment import calculate_apportionment
+from .core.utils import fill_partisan_score
 from .data.data_fetcher import DataFetcher
 from .data.partisan_providers import (
     AVAILABLE_PARTISAN_YEARS,
     available_manual_providers,
+    invalidate_provider_cache,
     provider_chain_for_state,
 )
-from .rendering.map_generator import MapGenerator
-from .workers.data_worker import DataFetcherWorker
 from .workers.redistricting_worker import RedistrictingWorker
 
+if TYPE_CHECKING:
+    from .rendering.map_generator import MapGenerator
+
+# geopandas/pyogrio (via data_worker) and matplotlib (via map_generator) are imported inside
+# the handlers that need them so the window appears without paying for them at startup.
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # orjson is optional; stdlib json is a drop-in fallback
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+CONFIG_PATH = "config.json"
+UI_EVENT_POLL_MS = 30
+_YEAR_VALUES = tuple(str(y) for y in AVAILABLE_PARTISAN_YEARS)
+
+
+@functools.lru_cache(maxsize=256)
+def _provider_labels(providers) -> tuple:
+    """Combobox labels for a (cached, hashable) provider chain."""
+    return tuple(meta.label for meta in providers)
+
 
 class MainWindow(tb.Window):
     def __init__(self):
@@ -30,14 +62,19 @@ class MainWindow(tb.Window):
         self.geometry("1280x820")
 
         # state
-        self.map_generator: Optional[MapGenerator] = None
+        self.map_generator: Optional["MapGenerator"] = None
         self.apportionment: Optional[Dict[str, int]] = None
         self.coi_file_path: Optional[str] = None
         self.manual_provider_key: Optional[str] = None
-        self.current_provider_chain = []
+        self.current_provider_chain = ()
+        self._last_chain_key = None
+        self._populated_providers = None
         self.last_applied_provider_meta = None
         self.provider_details_text = ""
         self.state_fips_by_name: Dict[str, str] = {}
+        self._current_fips: Optional[str] = None
+        self._ui_refresh_depth = 0
+        self._pending_ui_refresh = False
         self._map_photo = None
 
         # Tk variables
@@ -51,6 +88,8 @@ class MainWindow(tb.Window):
         self.pop_weight_var = tb.IntVar(value=100)
         self.compactness_var = tb.IntVar(value=100)
         self.election_year_var = tb.StringVar()
+        self.state_name_var = tb.StringVar()
+        self.state_name_var.trace_add("write", self._cache_selected_state_fips)
         self.algorithm_var = tb.StringVar(value="Divide and Conquer (Fair)")
         self.progress_value = tb.IntVar(value=0)
         self.progress_text = tb.StringVar(value="")
@@ -61,10 +100,13 @@ class MainWindow(tb.Window):
         self.data_contest_var = tb.StringVar(value="Contest: -")
         self.data_source_status_var = tb.StringVar(value="Source: -")
 
+        self._ui_events = queue.Queue()
+        self._start_async_loop()
         self._build_ui()
         self._load_api_key()
         self._refresh_provider_chain()
         self._auto_apportion_on_start()
+        self.after(UI_EVENT_POLL_MS, self._drain_ui_events)
 
     # ------------------------- UI BUILD ------------------------- #
     def _build_ui(self):
@@ -109,9 +151,8 @@ class MainWindow(tb.Window):
         # State selection
         tb.Label(controls, text="Select State:").pack(anchor="w", pady=(6, 0))
         self.state_combo = tb.Combobox(
-            controls, state="disabled", textvariable=tb.StringVar()
+            controls, state="disabled", textvariable=self.state_name_var
         )
-        self.state_combo.bind("<<ComboboxSelected>>", self._on_state_changed)
         self.state_combo.pack(fill="x", pady=2)
 
         # Number of districts
@@ -161,18 +202,14 @@ class MainWindow(tb.Window):
         tb.Label(
             controls, text="Election Year (Partisan Data):"
         ).pack(anchor="w", pady=(6, 0))
-        year_values = [str(y) for y in AVAILABLE_PARTISAN_YEARS]
         self.election_year_combo = tb.Combobox(
             controls,
-            values=year_values,
+            values=_YEAR_VALUES,
             textvariable=self.election_year_var,
             state="readonly",
         )
-        if year_values:
-            self.election_year_var.set(year_values[-1])
-        self.election_year_combo.bind(
-            "<<ComboboxSelected>>", self._handle_election_year_changed
-        )
+        if _YEAR_VALUES:
+            self.election_year_var.set(_YEAR_VALUES[-1])
         self.election_year_combo.pack(fill="x", pady=2)
 
         # Data quality group
@@ -200,9 +237,6 @@ class MainWindow(tb.Window):
         self.partisan_provider_combo = tb.Combobox(
             controls, state="disabled", values=[]
         )
-        self.partisan_provider_combo.bind(
-            "<<ComboboxSelected>>", self._handle_manual_provider_changed
-        )
         self.partisan_provider_combo.pack(fill="x", pady=2)
 
         # Run + progress
@@ -231,7 +265,7 @@ class MainWindow(tb.Window):
         self.export_png_btn.pack(fill="x", pady=(8, 2))
         self.export_shp_btn = tb.Button(
             controls,
-            text="Export as Shapefile",
+            text="Export Districts (GIS)",
             command=self.export_as_shapefile,
             state="disabled",
         )
@@ -255,6 +289,29 @@ class MainWindow(tb.Window):
         )
         self.map_label.grid(row=0, column=0, sticky="nsew")
 
+        # Widget groups toggled together while workers run
+        self._action_buttons = (
+            self.generate_btn,
+            self.calc_apportion_btn,
+            self.coi_button,
+            self.clear_cache_btn,
+        )
+        self._toggleable_widgets = (
+            self.state_combo,
+            self.num_districts_spin,
+            self.algorithm_combo,
+            self.election_year_combo,
+            self.partisan_provider_combo,
+        ) + self._action_buttons
+        self._export_buttons = (self.export_png_btn, self.export_shp_btn)
+
+        for widget, sequence, handler in (
+            (self.state_combo, "<<ComboboxSelected>>", self._on_state_changed),
+            (self.election_year_combo, "<<ComboboxSelected>>", self._handle_election_year_changed),
+            (self.partisan_provider_combo, "<<ComboboxSelected>>", self._handle_manual_provider_changed),
+        ):
+            widget.bind(sequence, handler)
+
     def _labeled_entry(self, parent, label, var, placeholder: Optional[str] = None):
         row = tb.Frame(parent)
         row.pack(fill="x", pady=4)
@@ -282,74 +339,118 @@ class MainWindow(tb.Window):
         scale.pack(fill="x", pady=2)
 
     # ------------------------- UTIL ------------------------- #
+    def _cache_selected_state_fips(self, *_):
+        self._current_fips = self.state_fips_by_name.get(self.state_name_var.get())
+
     def _get_selected_state_fips(self) -> Optional[str]:
-        name = self.state_combo.get()
-        return self.state_fips_by_name.get(name)
+        return self._current_fips
+
+    def _read_config(self) -> dict:
+        try:
+            with open(CONFIG_PATH, "rb") as f:
+                return _json_loads(f.read())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
 
     def _save_api_key(self):
         api_key = self.api_key_var.get()
         github_token = self.github_token_var.get()
-        try:
-            with open("config.json", "r") as f:
-                config = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            config = {}
+        original = self._read_config()
+        config = dict(original)
         config["api_key"] = api_key
         if github_token:
             config["github_token"] = github_token
         elif "github_token" in config:
             del config["github_token"]
-        with open("config.json", "w") as f:
-            json.dump(config, f)
+        if config == original:
+            return
+        with open(CONFIG_PATH, "wb") as f:
+            f.write(_json_dumps(config))
 
     def _load_api_key(self):
-        try:
-            with open("config.json", "r") as f:
-                config = json.load(f)
-                api_key = config.get("api_key")
-                if api_key:
-                    self.api_key_var.set(api_key)
-                github_token = config.get("github_token")
-                if github_token:
-                    self.github_token_var.set(github_token)
-        except (FileNotFoundError, json.JSONDecodeError):
-            pass
+        config = self._read_config()
+        api_key = config.get("api_key")
+        if api_key:
+            self.api_key_var.set(api_key)
+        github_token = config.get("github_token")
+        if github_token:
+            self.github_token_var.set(github_token)
+
+    def _start_async_loop(self):
+        """Run a single asyncio loop in a daemon thread for background I/O."""
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+    def _submit_coro(self, coro, callback, error_callback=None):
+        """Schedule coro on the background loop and deliver its result on the Tk thread."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+        def done(fut):
+            try:
+                result = fut.result()
+            except Exception as exc:
+                handler = error_callback or (lambda e: messagebox.showerror("Error", str(e)))
+                self._post_event(handler, exc)
+                return
+            self._post_event(callback, result)
+
+        future.add_done_callback(done)
+        return future
+
+    def _post_event(self, fn, *args):
+        """Queue fn(*args) to run on the Tk thread; safe to call from any thread."""
+        self._ui_events.put((fn, args))
+
+    def _drain_ui_events(self):
+        """Run queued UI events, collapsing bursts of progress updates to the latest one."""
+        latest_progress = None
+        while True:
+            try:
+                fn, args = self._ui_events.get_nowait()
+            except queue.Empty:
+                break
+            if fn == self._set_progress:
+                latest_progress = args
+                continue
+            if latest_progress is not None:
+                self._set_progress(*latest_progress)
+                latest_progress = None
+            try:
+                fn(*args)
+            except Exception as exc:
+                messagebox.showerror("Error", str(exc))
+        if latest_progress is not None:
+            self._set_progress(*latest_progress)
+        self.after(UI_EVENT_POLL_MS, self._drain_ui_events)
 
     def _set_progress(self, value: int, text: str = ""):
         self.progress_value.set(max(0, min(100, value)))
         self.progress_text.set(text)
 
+    def _set_widgets_state(self, widgets, state: str):
+        """Apply a -state value to several widgets in a single Tcl dispatch."""
+        if widgets:
+            self.tk.call("foreach", "w", tuple(str(w) for w in widgets), f"$w configure -state {state}")
+
     def _disable_controls(self):
-        for widget in [
-            self.state_combo,
-            self.num_districts_spin,
-            self.algorithm_combo,
-            self.election_year_combo,
-            self.partisan_provider_combo,
-            self.generate_btn,
-            self.calc_apportion_btn,
-            self.coi_button,
-            self.clear_cache_btn,
-        ]:
-            widget.configure(state="disabled")
+        self._set_widgets_state(self._toggleable_widgets, "disabled")
         self._set_export_state(False)
 
     def _enable_controls(self):
-        self.state_combo.configure(state="readonly" if self.apportionment else "disabled")
-        self.num_districts_spin.configure(state="normal" if self.apportionment else "disabled")
-        self.algorithm_combo.configure(state="readonly")
+        states = {"readonly": [self.algorithm_combo], "normal": list(self._action_buttons), "disabled": []}
+        states["readonly" if self.apportionment else "disabled"].append(self.state_combo)
+        states["normal" if self.apportionment else "disabled"].append(self.num_districts_spin)
+        states["readonly" if self.manual_override_var.get() else "disabled"].append(self.partisan_provider_combo)
+        for state, widgets in states.items():
+            self._set_widgets_state(widgets, state)
         self._update_election_year_control()
-        if self.manual_override_var.get():
-            self.partisan_provider_combo.configure(state="readonly")
-        else:
-            self.partisan_provider_combo.configure(state="disabled")
-        for widget in [self.generate_btn, self.calc_apportion_btn, self.coi_button, self.clear_cache_btn]:
-            widget.configure(state="normal")
 
     # ------------------------- ACTIONS ------------------------- #
     def clear_cache(self):
         cache_dir = ".cache"
         try:
+            invalidate_provider_cache()
+            self._last_chain_key = None
             if os.path.exists(cache_dir):
                 shutil.rmtree(cache_dir)
                 messagebox.showinfo(
@@ -372,41 +473,37 @@ class MainWindow(tb.Window):
     def run_apportionment_calculation(self):
         self._save_api_key()
         api_key = self.api_key_var.get()
+        house_size = self.house_size_var.get()
 
-        def worker():
+        async def compute():
             fetcher = DataFetcher(api_key)
-            state_populations = fetcher.get_all_states_population_data()
+            state_populations = await fetcher.get_all_states_population_data_async()
             if not state_populations:
-                self.after(
-                    0,
-                    lambda: messagebox.showerror(
-                        "Error",
-                        "Failed to fetch population data. Please check the console for details.",
-                    ),
-                )
-                return
-
-            house_size = self.house_size_var.get()
-            apportionment = calculate_apportionment(state_populations, house_size)
+                return None
+            return calculate_apportionment(state_populations, house_size)
 
-            def update():
-                self.apportionment = apportionment
-                names = []
-                self.state_fips_by_name = {}
-                for state in us.states.STATES:
-                    if state.fips in self.apportionment:
-                        names.append(state.name)
-                        self.state_fips_by_name[state.name] = state.fips
-                self.state_combo.configure(values=names, state="readonly")
-                if names:
-                    self.state_combo.set(names[0])
-                self.num_districts_spin.configure(state="normal")
-                self.update_num_districts()
-                self._refresh_provider_chain()
+        self._submit_coro(compute(), self._apply_apportionment)
 
-            self.after(0, update)
-
-        threading.Thread(target=worker, daemon=True).start()
+    def _apply_apportionment(self, apportionment):
+        if not apportionment:
+            messagebox.showerror(
+                "Error",
+                "Failed to fetch population data. Please check the console for details.",
+            )
+            return
+        self.apportionment = apportionment
+        names = []
+        self.state_fips_by_name = {}
+        for state in us.states.STATES:
+            if state.fips in self.apportionment:
+                names.append(state.name)
+                self.state_fips_by_name[state.name] = state.fips
+        self.state_combo.configure(values=names, state="readonly")
+        if names:
+            self.state_combo.set(names[0])
+        self.num_districts_spin.configure(state="normal")
+        self.update_num_districts()
+        self._refresh_provider_chain()
 
     def update_num_districts(self, *_):
         if not self.apportionment:
@@ -422,14 +519,37 @@ class MainWindow(tb.Window):
                 self.generate_btn.configure(state="normal")
         self._refresh_provider_chain()
 
+    @contextlib.contextmanager
+    def _batch_ui(self):
+        """Defer provider/year refreshes until the outermost batch exits, then run them once."""
+        self._ui_refresh_depth += 1
+        try:
+            yield
+        finally:
+            self._ui_refresh_depth -= 1
+            if self._ui_refresh_depth == 0 and self._pending_ui_refresh:
+                self.after_idle(self._apply_pending_refresh)
+
+    def _apply_pending_refresh(self):
+        if not self._pending_ui_refresh:
+            return
+        self._pending_ui_refresh = False
+        self._refresh_provider_chain()
+        self._update_election_year_control()
+
     def _refresh_provider_chain(self):
+        if self._ui_refresh_depth:
+            self._pending_ui_refresh = True
+            return
+        if self._provider_chain_key() == self._last_chain_key:
+            return
         state_fips = self._get_selected_state_fips()
         manual_key = self.manual_provider_key if self.manual_override_var.get() else None
         requested_year = self._selected_year()
 
+        available = available_manual_providers(state_fips, requested_year)
+        self._populate_manual_provider_combo(available)
         if self.manual_override_var.get():
-            available = available_manual_providers(state_fips, requested_year)
-            self._populate_manual_provider_combo(available)
             available_keys = [meta.key for meta in available]
             if not available_keys:
                 messagebox.showwarning(
@@ -444,19 +564,25 @@ class MainWindow(tb.Window):
                 self.manual_provider_key = available_keys[0]
                 self.partisan_provider_combo.set(available[0].label)
                 manual_key = self.manual_provider_key
-        else:
-            available = available_manual_providers(state_fips, requested_year)
-            self._populate_manual_provider_combo(available)
 
         chain = provider_chain_for_state(state_fips, requested_year, manual_key)
         self.current_provider_chain = chain
+        # Keyed on the inputs as they stand after any manual-provider fallback above.
+        self._last_chain_key = self._provider_chain_key()
         active_meta = chain[0] if chain else None
         self._update_data_quality_panel(active_meta)
         self._update_election_year_control()
 
+    def _provider_chain_key(self):
+        manual_override = self.manual_override_var.get()
+        manual_key = self.manual_provider_key if manual_override else None
+        return self._get_selected_state_fips(), self._selected_year(), manual_key, manual_override
+
     def _populate_manual_provider_combo(self, providers):
-        labels = [meta.label for meta in providers]
-        self.partisan_provider_combo.configure(values=labels)
+        # Chains are memoized, so an identical tuple means the combobox already lists them.
+        if providers is not self._populated_providers:
+            self.partisan_provider_combo.configure(values=_provider_labels(providers))
+            self._populated_providers = providers
         if self.manual_provider_key:
             for meta in providers:
                 if meta.key == self.manual_provider_key:
@@ -530,6 +656,9 @@ class MainWindow(tb.Window):
         self._refresh_provider_chain()
 
     def _update_election_year_control(self):
+        if self._ui_refresh_depth:
+            self._pending_ui_refresh = True
+            return
         active_meta = self.current_provider_chain[0] if self.current_provider_chain else None
         allow = bool(active_meta and active_meta.supports_year_selection and self.state_combo.cget("state") != "disabled")
         self.election_year_combo.configure(state="readonly" if allow else "disabled")
@@ -571,15 +700,17 @@ class MainWindow(tb.Window):
         )
         resolution = "tract" if self.fast_mode_var.get() else "block"
 
+        from .workers.data_worker import DataFetcherWorker
+
         worker = DataFetcherWorker(
             state_fips,
             api_key,
             election_year=election_year,
             provider_keys=provider_keys,
             resolution=resolution,
-            progress_callback=lambda v: self.after(0, lambda: self._set_progress(v, "Fetching data...")),
-            finished_callback=lambda df, shp: self.after(0, lambda: self.handle_data_fetched(df, shp)),
-            error_callback=lambda msg: self.after(0, lambda: self.handle_data_fetch_error(msg)),
+            progress_callback=lambda v: self._post_event(self._set_progress, v, "Fetching data..."),
+            finished_callback=functools.partial(self._post_event, self.handle_data_fetched),
+            error_callback=functools.partial(self._post_event, self.handle_data_fetch_error),
         )
 
         threading.Thread(target=worker.fetch_data, daemon=True).start()
@@ -594,22 +725,16 @@ class MainWindow(tb.Window):
         self._set_progress(0, "Redistricting...")
 
         try:
-            state_gdf = gpd.read_file(shapefile_path)
+            from .workers.data_worker import join_on_geoid, read_unit_geometries
+
+            state_gdf = read_unit_geometries(shapefile_path, counties=census_df["county"].unique())
             if "GEOID" not in state_gdf.columns:
                 if "GEOID20" in state_gdf.columns:
                     state_gdf["GEOID"] = state_gdf["GEOID20"]
                 else:
                     raise RuntimeError("Shapefile missing GEOID/GEOID20 field.")
-            merged_gdf = state_gdf.merge(census_df, on="GEOID")
-            if "partisan_score" not in merged_gdf.columns:
-                merged_gdf["partisan_score"] = 0.5
-            merged_gdf["partisan_score"] = pd.to_numeric(
-                merged_gdf["partisan_score"], errors="coerce"
-            )
-            fallback = merged_gdf["partisan_score"].mean()
-            if pd.isna(fallback):
-                fallback = 0.5
-            merged_gdf["partisan_score"] = merged_gdf["partisan_score"].fillna(fallback)
+            merged_gdf = join_on_geoid(state_gdf, census_df)
+            fill_partisan_score(merged_gdf)
         except Exception as exc:
             self.handle_redistricting_error(f"Failed to prepare data: {exc}")
             return
@@ -622,32 +747,63 @@ class MainWindow(tb.Window):
             compactness_weight=self.compactness_var.get() / 100.0,
             vra_compliance=self.vra_var.get(),
             communities_of_interest=self.coi_file_path,
-            progress_callback=lambda v: self.after(0, lambda: self._set_progress(v, "Redistricting...")),
-            finished_callback=lambda districts: self.after(0, lambda: self.handle_redistricting_finished(districts)),
-            error_callback=lambda msg: self.after(0, lambda: self.handle_redistricting_error(msg)),
+            progress_callback=lambda v: self._post_event(self._set_progress, v, "Redistricting..."),
+            finished_callback=functools.partial(self._post_event, self.handle_redistricting_finished),
+            error_callback=functools.partial(self._post_event, self.handle_redistricting_error),
         )
         threading.Thread(target=worker.run, daemon=True).start()
 
     def _re_enable_ui_controls(self):
-        self._enable_controls()
-        self._set_progress(0, "")
-        self.update_num_districts()
+        with self._batch_ui():
+            self._enable_controls()
+            self._set_progress(0, "")
+            self.update_num_districts()
 
     def handle_redistricting_finished(self, districts_list):
-        all_districts_gdf = gpd.GeoDataFrame()
-        for i, district_gdf in enumerate(districts_list):
-            district_gdf["district_id"] = i
-            all_districts_gdf = pd.concat([all_districts_gdf, district_gdf])
+        import geopandas as gpd
+
+        from .rendering.map_generator import MapGenerator
+        from .workers.render_worker import RenderWorker
+
+        if districts_list:
+            all_districts_gdf = gpd.GeoDataFrame(
+                pd.concat(districts_list, ignore_index=True),
+                geometry=districts_list[0].geometry.name,
+                crs=districts_list[0].crs,
+            )
+            # One compact label array for all units (at most a few hundred districts).
+            all_districts_gdf["district_id"] = np.repeat(
+                np.arange(len(districts_list), dtype=np.uint16),
+                [len(district_gdf) for district_gdf in districts_list],
+            )
+        else:
+            all_districts_gdf = gpd.GeoDataFrame()
 
         self.map_generator = MapGenerator(all_districts_gdf)
-        map_image_path = self.map_generator.generate_map_image("temp_map.png")
+        self._set_progress(100, "Rendering map...")
+        worker = RenderWorker(
+            self.map_generator,
+            finished_callback=functools.partial(self._post_event, self.handle_render_finished),
+            error_callback=functools.partial(self._post_event, self.handle_render_error),
+        )
+        threading.Thread(target=worker.run, daemon=True).start()
+
+    def handle_render_finished(self, png: bytes):
+        # PhotoImage decodes base64 PNG data directly; the PNG also stays cached on the
+        # generator so "Export as PNG" does not re-render.
         try:
-            self._map_photo = tk.PhotoImage(file=map_image_path)
+            self._map_photo = tk.PhotoImage(data=base64.b64encode(png))
             self.map_label.configure(image=self._map_photo, text="")
-        except Exception:
+        except Exception as exc:
             # fallback to text if image fails
-            self.map_label.configure(text=f"Map generated at {map_image_path}")
+            self.map_label.configure(text=f"Map preview unavailable: {exc}")
+        self._finish_run()
+
+    def handle_render_error(self, error_message):
+        self.map_label.configure(text=f"Map preview unavailable: {error_message}")
+        self._finish_run()
 
+    def _finish_run(self):
         self._re_enable_ui_controls()
         self._set_progress(100, "Done.")
         self._set_export_state(enabled=True)
@@ -663,9 +819,7 @@ class MainWindow(tb.Window):
         self._set_export_state(enabled=False)
 
     def _set_export_state(self, enabled: bool):
-        state = "normal" if enabled else "disabled"
-        self.export_png_btn.configure(state=state)
-        self.export_shp_btn.configure(state=state)
+        self._set_widgets_state(self._export_buttons, "normal" if enabled else "disabled")
 
     # ------------------------- EXPORT ------------------------- #
     def export_as_png(self):
@@ -680,12 +834,16 @@ class MainWindow(tb.Window):
     def export_as_shapefile(self):
         if self.map_generator:
             file_path = filedialog.asksaveasfilename(
-                title="Save Districts as Shapefile",
-                defaultextension=".shp",
-                filetypes=[("Shapefiles", "*.shp")],
+                title="Save Districts",
+                defaultextension=".gpkg",
+                filetypes=[("GeoPackage", "*.gpkg"), ("GeoParquet", "*.parquet"), ("Shapefiles", "*.shp")],
             )
             if file_path:
-                self.map_generator.export_to_shapefile(file_path)
+                try:
+                    self.map_generator.export_to_shapefile(file_path)
+                except ValueError as exc:
+                    messagebox.showerror("Error", str(exc))
+                    return
                 messagebox.showinfo("Saved", f"Districts saved to {file_path}")
 
     # ------------------------- STARTUP ------------------------- #
@@ -11,24 +11,13 @@ import logging
 import os
 import sys
 from datetime import datetime
-from typing import List, Tuple
-
-import geopandas as gpd
-import numpy as np
-import pandas as pd
-import us
-from shapely.geometry import box
-
-from .core.apportionment import calculate_apportionment
-from .core.redistricting_algorithms import (
-    RedistrictingAlgorithm,
-    _polsby_popper_static,
-    _weighted_partisan_share,
-)
-from .core.utils import is_contiguous
-from .data.data_fetcher import DataFetcher
-from .rendering.map_generator import MapGenerator
-from .workers.data_worker import DataFetcherWorker
+from typing import TYPE_CHECKING, List, Tuple
+
+# geopandas/pandas and the pipeline modules are imported where they are used, so --help and
+# argument errors return without loading the geospatial stack.
+if TYPE_CHECKING:
+    import geopandas as gpd
+    import pandas as pd
 
 
 def _state_fips(arg: str) -> str:
@@ -38,7 +27,9 @@ def _state_fips(arg: str) -> str:
         return "00"
     if arg.isdigit():
         return arg.zfill(2)
-    state = us.states.lookup(arg)
+    from .data.states import lookup_state
+
+    state = lookup_state(arg)
     if not state:
         raise argparse.ArgumentTypeError(f"Unrecognized state: {arg}")
     return state.fips
@@ -128,7 +119,8 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--shp-out",
         default=None,
-        help="Optional path to save districts as ESRI Shapefile.",
+        help="Optional path to save districts; the extension picks the format and must be one of "
+             ".gpkg (GeoPackage), .parquet (GeoParquet) or .shp (ESRI Shapefile).",
     )
     parser.add_argument(
         "--demo",
@@ -153,37 +145,40 @@ def _demo_dataset(size=4, rich=False):
     Return a synthetic GeoDataFrame for smoke tests.
     rich=True produces higher minority share and designated COI cells.
     """
-    records = []
+    import geopandas as gpd
+    import numpy as np
+    import shapely
+
+    i, j = (grid.ravel() for grid in np.meshgrid(np.arange(size), np.arange(size), indexing="ij"))
     base_pop = 1000
-    for i in range(size):
-        for j in range(size):
-            geoid = f"000{i:02d}{j:02d}"
-            geom = box(i, j, i + 1, j + 1)
-            pop = base_pop + (i * size + j) * 25
-            # richer scenario: majority-minority overall
-            if rich:
-                minority = pop * (0.55 if (i + j) % 3 == 0 else 0.35)
-            else:
-                minority = pop * 0.4 if (i + j) % 2 == 0 else pop * 0.2
-            partisan = 0.3 if i < (size / 2) else 0.7  # left half leans D, right half leans R
-            records.append(
-                {
-                    "GEOID": geoid,
-                    "state": "00",
-                    "county": f"{i:03d}",
-                    "tract": f"{j:06d}",
-                    "P1_001N": pop,
-                    "P1_003N": pop - minority,  # non-Hisp white approx
-                    "partisan_score": partisan,
-                    "geometry": geom,
-                }
-            )
-    gdf = gpd.GeoDataFrame(records, geometry="geometry", crs="EPSG:4326")
+    pop = base_pop + (i * size + j) * 25
+    # richer scenario: majority-minority overall
+    if rich:
+        minority = pop * np.where((i + j) % 3 == 0, 0.55, 0.35)
+    else:
+        minority = pop * np.where((i + j) % 2 == 0, 0.4, 0.2)
+    partisan = np.where(i < (size / 2), 0.3, 0.7)  # left half leans D, right half leans R
+    gdf = gpd.GeoDataFrame(
+        {
+            "GEOID": [f"000{a:02d}{b:02d}" for a, b in zip(i.tolist(), j.tolist())],
+            "state": "00",
+            "county": [f"{a:03d}" for a in i.tolist()],
+            "tract": [f"{b:06d}" for b in j.tolist()],
+            "P1_001N": pop,
+            "P1_003N": pop - minority,  # non-Hisp white approx
+            "partisan_score": partisan,
+        },
+        geometry=shapely.box(i, j, i + 1, j + 1),
+        crs="EPSG:4326",
+    )
     return gdf
 
 
-def _merge_data(shapefile_path: str, census_df: pd.DataFrame) -> gpd.GeoDataFrame:
-    state_gdf = gpd.read_file(shapefile_path)
+def _merge_data(shapefile_path: str, census_df: "pd.DataFrame") -> "gpd.GeoDataFrame":
+    from .core.utils import fill_partisan_score
+    from .workers.data_worker import join_on_geoid, read_unit_geometries
+
+    state_gdf = read_unit_geometries(shapefile_path, counties=census_df["county"].unique())
     if "GEOID" in state_gdf.columns:
         pass  # GEOID is already present
     elif "GEOID20" in state_gdf.columns:
@@ -191,31 +186,54 @@ def _merge_data(shapefile_path: str, census_df: pd.DataFrame) -> gpd.GeoDataFram
     else:
         raise RuntimeError("Shapefile missing GEOID/GEOID20 field.")
 
-    merged = state_gdf.merge(census_df, on="GEOID")
+    merged = join_on_geoid(state_gdf, census_df)
 
-    if "partisan_score" not in merged.columns:
-        merged["partisan_score"] = 0.5
-    merged["partisan_score"] = pd.to_numeric(
-        merged["partisan_score"], errors="coerce"
-    )
-    fallback = merged["partisan_score"].mean()
-    if pd.isna(fallback):
-        fallback = 0.5
-    merged["partisan_score"] = merged["partisan_score"].fillna(fallback)
+    fill_partisan_score(merged)
     return merged
 
 
-def _compute_metrics(districts: List[gpd.GeoDataFrame]) -> List[Tuple]:
-    all_pop = sum(d["P1_001N"].sum() for d in districts)
-    ideal = all_pop / len(districts) if districts else 0
-    metrics = []
-    for idx, gdf in enumerate(districts):
-        pop = gdf["P1_001N"].sum()
-        dev_pct = 0 if ideal == 0 else ((pop - ideal) / ideal) * 100
-        compact = _polsby_popper_static(gdf)
-        partisan = _weighted_partisan_share(gdf)
-        metrics.append((idx, pop, dev_pct, compact, partisan))
-    return metrics
+def _compute_metrics(all_gdf: "gpd.GeoDataFrame", num_districts: int, compactness=None) -> List[Tuple]:
+    """
+    Per-district (id, population, deviation %, Polsby-Popper, partisan share), aggregated from
+    the combined frame's district_id column in one groupby pass.
+    compactness, when given, holds precomputed Polsby-Popper scores in district order.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from .core.utils import numeric_values, polsby_popper
+
+    if num_districts == 0:
+        return []
+    district_ids = pd.RangeIndex(num_districts)
+    by_district = all_gdf["district_id"].to_numpy()
+    pops = all_gdf["P1_001N"].groupby(by_district).sum().reindex(district_ids, fill_value=0)
+
+    # Same rules as weighted_partisan_share: missing weights count as 0, missing scores as 0.5,
+    # a district without population falls back to its mean score, and an empty district to 0.5.
+    if "partisan_score" in all_gdf.columns:
+        weights = numeric_values(all_gdf["P1_001N"], 0)
+        shares = numeric_values(all_gdf["partisan_score"], 0.5)
+        sums = (
+            pd.DataFrame({"weight": weights, "weighted": shares * weights, "share": shares})
+            .groupby(by_district)
+            .agg(weight=("weight", "sum"), weighted=("weighted", "sum"), share=("share", "mean"))
+            .reindex(district_ids)
+            .fillna({"weight": 0.0, "weighted": 0.0, "share": 0.5})
+        )
+        sums.loc[sums["weight"] <= 0, "weighted"] = sums["share"]
+        sums.loc[sums["weight"] <= 0, "weight"] = 1.0
+        partisan = (sums["weighted"] / sums["weight"]).to_numpy()
+    else:
+        partisan = np.full(num_districts, 0.5)
+
+    if compactness is None:
+        groups = dict(iter(all_gdf.groupby(by_district)))
+        compactness = [polsby_popper(groups[idx]) if idx in groups else 0 for idx in district_ids]
+
+    ideal = pops.sum() / num_districts
+    dev_pct = np.zeros(num_districts) if ideal == 0 else ((pops - ideal) / ideal * 100).to_numpy()
+    return list(zip(district_ids, pops.tolist(), dev_pct.tolist(), compactness, partisan.tolist()))
 
 
 def _print_metrics(metrics: List[Tuple]):
@@ -245,6 +263,15 @@ def main(argv=None):
         except Exception:
             pass
 
+    if args.shp_out:
+        from .rendering.map_generator import export_driver
+
+        # Reject an unsupported extension before any data is fetched.
+        try:
+            export_driver(args.shp_out)
+        except ValueError as exc:
+            parser.error(str(exc))
+
     logging.basicConfig(level=logging.INFO if not args.quiet else logging.WARNING, format="%(levelname)s: %(message)s")
 
     # Determine data mode
@@ -255,6 +282,8 @@ def main(argv=None):
 
     # In smoke mode, prefer a real small state; require cache unless explicitly allowed to demo
     if args.mode == "smoke" and args.state == "demo":
+        import us
+
         args.state = us.states.ME.fips  # Maine (2 districts), small geography
         args.resolution = "tract"
         cache_parquet = os.path.join(".cache", f"census_{args.state}_{args.resolution}.parquet")
@@ -273,6 +302,8 @@ def main(argv=None):
         merged_gdf = _demo_dataset(rich=True)
         shapefile_path = None
     else:
+        from .workers.data_worker import DataFetcherWorker
+
         provider_keys = [args.provider] if args.provider else None
         worker = DataFetcherWorker(
             args.state,
@@ -326,11 +357,21 @@ def main(argv=None):
             else:
                 parser.error(str(exc))
 
+    import geopandas as gpd
+    import numpy as np
+    import pandas as pd
+
+    from .core.redistricting_algorithms import RedistrictingAlgorithm
+    from .rendering.map_generator import MapGenerator
+
     num_districts = args.districts
     if num_districts is None:
         if demo_mode:
             num_districts = 4
         else:
+            from .core.apportionment import calculate_apportionment
+            from .data.data_fetcher import DataFetcher
+
             try:
                 pops = DataFetcher(args.api_key).get_all_states_population_data()
                 if pops:
@@ -356,20 +397,35 @@ def main(argv=None):
     districts = algo.divide_and_conquer() if args.algorithm == "fair" else algo.gerrymander()
 
     # Collect into single GeoDataFrame for export/plot
-    all_gdf = gpd.GeoDataFrame()
-    for i, district_gdf in enumerate(districts):
-        district_gdf = district_gdf.copy()
-        district_gdf["district_id"] = i
-        all_gdf = pd.concat([all_gdf, district_gdf])
+    if districts:
+        all_gdf = gpd.GeoDataFrame(
+            pd.concat(districts, ignore_index=True),
+            geometry=districts[0].geometry.name,
+            crs=districts[0].crs,
+        )
+        all_gdf["district_id"] = np.repeat(
+            np.arange(len(districts), dtype=np.uint16),
+            [len(district_gdf) for district_gdf in districts],
+        )
+    else:
+        all_gdf = gpd.GeoDataFrame()
 
     mg = MapGenerator(all_gdf)
     mg.generate_map_image(args.map_out)
     print(f"Map saved to {args.map_out}")
     if args.shp_out:
         mg.export_to_shapefile(args.shp_out)
-        print(f"Shapefile saved to {args.shp_out}")
+        print(f"Districts saved to {args.shp_out}")
+
+    # The map already dissolved every district; score compactness from those polygons in one pass.
+    compactness = None
+    if districts:
+        from .core.utils import polsby_popper_scores
 
-    metrics = _compute_metrics(districts)
+        dissolved = mg.dissolved_districts()
+        scores = pd.Series(polsby_popper_scores(dissolved.geometry.array), index=dissolved["district_id"])
+        compactness = scores.reindex(range(len(districts)), fill_value=0).tolist()
+    metrics = _compute_metrics(all_gdf, len(districts), compactness)
     if not args.quiet:
         print("\nDistrict metrics:")
         _print_metrics(metrics)
@@ -382,12 +438,14 @@ def main(argv=None):
 
     # Smoke-test assertions (lightweight)
     if args.mode == "smoke":
+        from .core.utils import districts_contiguous
+
         assert len(districts) == num_districts, "Incorrect number of districts"
         partisan_vals = [round(p, 2) for *_, p in metrics]
         assert len(set(partisan_vals)) >= 2, "Expected partisan variation across districts"
         # contiguity check
-        for d_idx, gdf in enumerate(districts):
-            assert is_contiguous(gdf), f"District {d_idx} is not contiguous"
+        for d_idx, contiguous in districts_contiguous(all_gdf).items():
+            assert contiguous, f"District {d_idx} is not contiguous"
         # COI check: force top-left 3 cells to stay together
         coi_list = [g for g in merged_gdf["GEOID"].head(3).tolist()]
         # run a COI-enforced plan and ensure same district
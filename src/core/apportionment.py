@@ -1,4 +1,4 @@
-import math
+import numpy as np
 
 
 def calculate_apportionment(state_populations, house_size):
@@ -17,19 +17,24 @@ def calculate_apportionment(state_populations, house_size):
         raise ValueError("House size must be at least the number of states.")
 
     # Initial allocation: each state gets one seat
-    seats = {state: 1 for state in state_populations}
+    states = list(state_populations)
     remaining_seats = house_size - num_states
-
-    # Allocate remaining seats using priority values
-    for _ in range(remaining_seats):
-        priorities = {}
-        for state, pop in state_populations.items():
-            n = seats[state]
-            priority = pop / math.sqrt(n * (n + 1))
-            priorities[state] = priority
-
-        # Find the state with the highest priority
-        next_seat_state = max(priorities, key=priorities.get)
-        seats[next_seat_state] += 1
-
-    return seats
+    if remaining_seats == 0:
+        return {state: 1 for state in states}
+
+    # A state's priority for its (n+1)th seat is pop / sqrt(n(n+1)), strictly decreasing in n, so
+    # awarding seats one at a time to the current maximum is the same as taking the largest
+    # remaining_seats values of the whole state x n priority table.
+    pops = np.fromiter(state_populations.values(), dtype=np.float64, count=num_states)
+    n = np.arange(1, remaining_seats + 1, dtype=np.float64)
+    priorities = (pops[:, None] / np.sqrt(n * (n + 1))).ravel()
+
+    # Everything above the cutoff wins outright; seats tied at the cutoff go to the earliest states
+    # in table order, as the greedy max() would award them. Partitioning avoids a full sort.
+    cutoff = np.partition(priorities, priorities.size - remaining_seats)[priorities.size - remaining_seats]
+    above = np.flatnonzero(priorities > cutoff)
+    tied = np.flatnonzero(priorities == cutoff)[: remaining_seats - above.size]
+    winners = np.concatenate((above, tied))
+    seats = np.bincount(winners // remaining_seats, minlength=num_states) + 1
+
+    return dict(zip(states, seats.tolist()))
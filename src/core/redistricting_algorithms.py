@@ -4,6 +4,8 @@ from functools import partial
 import numpy as np
 import pandas as pd
 
+from .utils import polsby_popper, weighted_partisan_share
+
 
 class Signal:
     def __init__(self):
@@ -19,33 +21,22 @@ class Signal:
 
 def _weighted_partisan_share(gdf):
     """Returns the population-weighted partisan share for a partition."""
-    if gdf.empty or 'partisan_score' not in gdf.columns:
-        return 0.5
-    weights = pd.to_numeric(gdf['P1_001N'], errors='coerce').fillna(0)
-    shares = pd.to_numeric(gdf['partisan_score'], errors='coerce').fillna(0.5)
-    total = weights.sum()
-    if total <= 0:
-        return shares.mean() if not shares.empty else 0.5
-    return float((shares * weights).sum() / total)
+    return weighted_partisan_share(gdf)
 
 
 def _polsby_popper_static(gdf):
     """
     Calculates the Polsby-Popper compactness score for a GeoDataFrame.
     """
-    if gdf.empty or gdf.unary_union.area == 0:
-        return 0
-    perimeter = gdf.unary_union.length
-    area = gdf.unary_union.area
-    if perimeter == 0:
-        return 0
-    return (4 * np.pi * area) / (perimeter ** 2)
+    return polsby_popper(gdf)
 
 
 def _calculate_split_score_static(area_gdf, part1, part2, target_pop1, population_equality_weight, compactness_weight,
-                                  partisan_weight, vra_compliance, communities_of_interest, coi_weight, target_party=None):
+                                  partisan_weight, vra_compliance, communities_of_interest, coi_weight, target_party=None,
+                                  coi_split=None):
     """
     Calculates a score for a given split based on population balance, compactness, and VRA compliance.
+    coi_split, when provided, is a precomputed flag telling whether the split divides the COI blocks.
     """
     pop1 = part1['P1_001N'].sum()
     pop_balance_score = abs(pop1 - target_pop1) / target_pop1 if target_pop1 > 0 else 0
@@ -113,7 +104,9 @@ def _calculate_split_score_static(area_gdf, part1, part2, target_pop1, populatio
             partisan_score = 1 - abs(party1_part1 - 0.5) - abs(party1_part2 - 0.5)
 
     coi_score = 0
-    if communities_of_interest:
+    if coi_split is not None:
+        coi_score = 1 if coi_split else 0
+    elif communities_of_interest:
         coi_blocks_in_area = area_gdf[area_gdf['GEOID'].isin(communities_of_interest)]
         if not coi_blocks_in_area.empty:
             coi_blocks_in_part1 = part1[part1['GEOID'].isin(communities_of_interest)]
@@ -129,7 +122,8 @@ def _calculate_split_score_static(area_gdf, part1, part2, target_pop1, populatio
 
 
 def _process_angle(angle, area_gdf, centroid, target_pop1, population_equality_weight, compactness_weight,
-                   partisan_weight, vra_compliance, communities_of_interest, coi_weight, target_party=None):
+                   partisan_weight, vra_compliance, communities_of_interest, coi_weight, target_party=None,
+                   coi_mask=None):
     rad = np.deg2rad(angle)
     c_x, c_y = centroid.x, centroid.y
 
@@ -143,9 +137,14 @@ def _process_angle(angle, area_gdf, centroid, target_pop1, population_equality_w
     if part1.empty or part2.empty:
         return float('inf'), None
 
+    coi_split = None
+    if coi_mask is not None:
+        side_values = side.to_numpy()
+        coi_split = bool(coi_mask[side_values].any() and coi_mask[~side_values].any())
+
     score = _calculate_split_score_static(area_gdf, part1, part2, target_pop1, population_equality_weight,
                                           compactness_weight, partisan_weight, vra_compliance, communities_of_interest,
-                                          coi_weight, target_party)
+                                          coi_weight, target_party, coi_split=coi_split)
 
     return score, {'part1': part1, 'part2': part2}
 
@@ -172,6 +171,9 @@ class RedistrictingAlgorithm:
         self.partisan_weight = partisan_weight
         self.vra_compliance = vra_compliance
         self.communities_of_interest = communities_of_interest
+        # Hashed once: per-area membership is then a lookup of the area's GEOIDs, whereas
+        # Series.isin re-converts the whole COI list on every call.
+        self._coi_index = pd.Index(communities_of_interest).unique() if communities_of_interest else None
         self.coi_weight = coi_weight
         self.target_party = target_party
 
@@ -213,6 +215,11 @@ class RedistrictingAlgorithm:
         centroid = area_gdf_proj.unary_union.centroid
         angles = np.linspace(0, 180, 10)
 
+        # Resolve COI membership once per area; each angle then only masks a boolean array.
+        coi_mask = None
+        if self._coi_index is not None:
+            coi_mask = self._coi_index.get_indexer(area_gdf_proj['GEOID']) >= 0
+
         worker_func = partial(
             _process_angle,
             area_gdf=area_gdf_proj,
@@ -225,6 +232,7 @@ class RedistrictingAlgorithm:
             communities_of_interest=self.communities_of_interest,
             coi_weight=self.coi_weight,
             target_party=self.target_party,
+            coi_mask=coi_mask,
         )
 
         # Use threads instead of processes to avoid spawn/pickle overhead on free-threading Python.
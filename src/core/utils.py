@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+import shapely
 
 
 def ensure_numeric(df: pd.DataFrame, columns):
@@ -10,63 +11,138 @@ def ensure_numeric(df: pd.DataFrame, columns):
     return df
 
 
+def fill_partisan_score(df: pd.DataFrame, default=0.5):
+    """
+    Coerce partisan_score to float32 and fill gaps with the column mean (default when all missing).
+    Scores are 0..1 shares, so float32 keeps ample precision at half the memory.
+    """
+    if "partisan_score" not in df.columns:
+        df["partisan_score"] = np.float32(default)
+        return df
+    scores = df["partisan_score"]
+    if scores.dtype.kind not in "fiu":
+        scores = pd.to_numeric(scores, errors="coerce")
+    arr = scores.to_numpy(dtype=np.float32, na_value=np.nan, copy=True)
+    mask = np.isnan(arr)
+    if mask.all():
+        arr[:] = default
+    elif mask.any():
+        arr[mask] = np.nanmean(arr)
+    df["partisan_score"] = arr
+    return df
+
+
+def numeric_values(series: pd.Series, fill) -> np.ndarray:
+    """float64 array of series with missing/unparseable entries set to fill; numeric columns skip pd.to_numeric."""
+    if series.dtype.kind not in "fiu":
+        series = pd.to_numeric(series, errors='coerce')
+    return np.nan_to_num(series.to_numpy(dtype=np.float64, na_value=np.nan), nan=fill)
+
+
 def weighted_partisan_share(gdf):
     """Population-weighted partisan share."""
     if gdf.empty or 'partisan_score' not in gdf.columns:
         return 0.5
-    weights = pd.to_numeric(gdf['P1_001N'], errors='coerce').fillna(0)
-    shares = pd.to_numeric(gdf['partisan_score'], errors='coerce').fillna(0.5)
+    weights = numeric_values(gdf['P1_001N'], 0)
+    shares = numeric_values(gdf['partisan_score'], 0.5)
     total = weights.sum()
     if total <= 0:
-        return shares.mean() if not shares.empty else 0.5
-    return float((shares * weights).sum() / total)
+        return float(shares.mean())
+    return float(np.dot(shares, weights) / total)
+
+
+def coverage_union(geometries):
+    """
+    Union of polygons that should form a coverage (Census units tile without overlaps), using the
+    linear-time coverage union. Input that is not a clean coverage either makes GEOS raise
+    (incorrectly noded edges) or yields an invalid result (overlapping parts); both fall back to a
+    full union.
+    """
+    geometries = np.asarray(geometries)
+    try:
+        union = shapely.coverage_union_all(geometries)
+    except shapely.errors.GEOSException:
+        return shapely.union_all(geometries)
+    if not union.is_valid:
+        union = shapely.union_all(geometries)
+    return union
+
+
+def union_area_perimeter(gdf):
+    """Area and perimeter of the union of gdf's polygons, computed with a single union."""
+    union = coverage_union(gdf.geometry.array)
+    return union.area, union.length
 
 
 def polsby_popper(gdf):
     """Polsby-Popper compactness score."""
-    if gdf.empty or gdf.unary_union.area == 0:
+    if gdf.empty:
         return 0
-    perimeter = gdf.unary_union.length
-    area = gdf.unary_union.area
-    if perimeter == 0:
+    area, perimeter = union_area_perimeter(gdf)
+    if area == 0 or perimeter == 0:
         return 0
     return (4 * np.pi * area) / (perimeter ** 2)
 
 
+def polsby_popper_scores(geometries) -> np.ndarray:
+    """Polsby-Popper score of each geometry in an array (e.g. already-dissolved districts)."""
+    geometries = np.asarray(geometries)
+    area = shapely.area(geometries)
+    perimeter = shapely.length(geometries)
+    scores = np.zeros(len(geometries))
+    valid = (area > 0) & (perimeter > 0)
+    scores[valid] = (4 * np.pi * area[valid]) / (perimeter[valid] ** 2)
+    return scores
+
+
 def build_adjacency(gdf):
     """Queen contiguity adjacency using spatial index."""
     adjacency = {i: set() for i in range(len(gdf))}
-    sindex = gdf.sindex
-    for i, geom in enumerate(gdf.geometry):
-        possible = list(sindex.query(geom, predicate="intersects"))
-        for j in possible:
-            if i == j:
-                continue
-            adjacency[i].add(j)
-            adjacency[j].add(i)
+    left, right = gdf.sindex.query(gdf.geometry, predicate="intersects")
+    keep = left != right
+    for i, j in zip(left[keep].tolist(), right[keep].tolist()):
+        adjacency[i].add(j)
     return adjacency
 
 
+def connected_component_labels(n, left, right):
+    """
+    Label the nodes 0..n-1 of an undirected graph given as edge arrays by connected component.
+    Each node ends up labelled with the smallest node index in its component.
+    """
+    labels = np.arange(n)
+    if len(left) == 0:
+        return labels
+    while True:
+        # Pull the smaller endpoint label across every edge, then shortcut label chains.
+        lowest = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, lowest)
+        np.minimum.at(updated, right, lowest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
 def is_contiguous(gdf):
     """Return True if GeoDataFrame is spatially contiguous."""
     if gdf.empty:
         return True
-    gdf = gdf.reset_index(drop=True)
-    sindex = gdf.sindex
-    adj = {i: set() for i in range(len(gdf))}
-    for i, geom in enumerate(gdf.geometry):
-        hits = sindex.query(geom, predicate="touches")
-        for j in hits:
-            if i == j:
-                continue
-            adj[i].add(j)
-            adj[j].add(i)
-    seen = {0}
-    stack = [0]
-    while stack:
-        cur = stack.pop()
-        for nb in adj[cur]:
-            if nb not in seen:
-                seen.add(nb)
-                stack.append(nb)
-    return len(seen) == len(gdf)
+    # For non-overlapping units intersects equals touches plus self-pairs, and is far cheaper in GEOS.
+    left, right = gdf.sindex.query(gdf.geometry, predicate="intersects")
+    labels = connected_component_labels(len(gdf), left, right)
+    return bool((labels == 0).all())
+
+
+def districts_contiguous(gdf, column="district_id") -> pd.Series:
+    """
+    Contiguity of every district in a combined frame, keyed by district id.
+    Uses one spatial index and one bulk query for all units instead of an index per district:
+    pairs are kept only within a district, and a district is contiguous when its units share one label.
+    """
+    ids = gdf[column].to_numpy()
+    left, right = gdf.sindex.query(gdf.geometry, predicate="intersects")
+    same = ids[left] == ids[right]
+    labels = connected_component_labels(len(gdf), left[same], right[same])
+    return pd.Series(labels).groupby(ids).nunique().eq(1)
@@ -1,22 +1,69 @@
+import asyncio
+import json
+import os
+import time
+
 import us
 from census import Census
 
+POPULATION_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
 
 class DataFetcher:
-    def __init__(self, api_key):
+    # Populations are keyed by decennial census year, so one fetch serves every instance.
+    _memory_cache = {}
+
+    def __init__(self, api_key, cache_dir=".cache"):
         self.api_key = api_key
         self.c = Census(self.api_key)
+        self.cache_dir = cache_dir
+
+    def _population_cache_path(self, year):
+        return os.path.join(self.cache_dir, f"state_populations_{year}.json")
+
+    def _load_population_cache(self, year):
+        path = self._population_cache_path(year)
+        try:
+            if time.time() - os.path.getmtime(path) > POPULATION_CACHE_TTL_SECONDS:
+                return None
+            with open(path, "r") as fp:
+                return json.load(fp)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _save_population_cache(self, year, state_populations):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._population_cache_path(year), "w") as fp:
+                json.dump(state_populations, fp)
+        except OSError as e:
+            print(f"Unable to write population cache: {e}")
 
     def get_all_states_population_data(self):
         """
         Fetches the total population for all states.
+        Results are memoized in-process and on disk (refreshed after 30 days).
         """
+        year = self.c.pl.default_year
+        cached = self._memory_cache.get(year) or self._load_population_cache(year)
+        if cached:
+            self._memory_cache[year] = cached
+            return dict(cached)
         try:
             data = self.c.pl.state(('NAME', 'P1_001N'), Census.ALL)
             state_fips_list = [state.fips for state in us.states.STATES]
             state_populations = {item['state']: int(item['P1_001N']) for item in data if
                                  item['state'] in state_fips_list}
-            return state_populations
         except Exception as e:
             print(f"An error occurred: {e}")
             return None
+        if state_populations:
+            self._memory_cache[year] = state_populations
+            self._save_population_cache(year, state_populations)
+        return dict(state_populations)
+
+    async def get_all_states_population_data_async(self):
+        """
+        Awaitable variant of get_all_states_population_data; the blocking Census client runs in a worker thread.
+        """
+        return await asyncio.to_thread(self.get_all_states_population_data)
@@ -1,10 +1,13 @@
+import hashlib
+import json
 import logging
 import os
 from typing import Optional
 import requests
 
 import pandas as pd
-import us
+
+from .states import lookup_state
 
 
 class CountyPresidentialReturnsProvider:
@@ -16,9 +19,13 @@ class CountyPresidentialReturnsProvider:
     # Direct download for "countypres_2000-2024.tab" (ID 13256842)
     FILE_URL = "https://dataverse.harvard.edu/api/access/datafile/13256842"
     COUNTY_FILE_LABEL = "countypres_2000-2024.tab"
+    DATASET_COLUMNS = ("year", "state_po", "office", "county_fips", "party", "candidatevotes")
+    PARQUET_ROW_GROUP_SIZE = 16_384
+    DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
 
-    def __init__(self, cache_root: str = ".cache"):
+    def __init__(self, cache_root: str = ".cache", session: Optional[requests.Session] = None):
         self.cache_dir = os.path.join(cache_root, "partisan")
+        self.session = session or requests.Session()
         os.makedirs(self.cache_dir, exist_ok=True)
 
     def get_state_scores(self, state_fips: str, election_year: int) -> Optional[pd.DataFrame]:
@@ -27,29 +34,19 @@ class CountyPresidentialReturnsProvider:
         """
         if not state_fips:
             return None
-        state = us.states.lookup(state_fips)
+        state = lookup_state(state_fips)
         if not state:
             return None
 
-        dataset_path = self._ensure_dataset_file()
-        if not dataset_path:
-            return None
-
         try:
-            df = pd.read_csv(
-                dataset_path,
-                sep="\t",
-                dtype={"county_fips": str, "year": int, "state_po": str, "party": str, "candidatevotes": int},
-            )
+            df_state = self._read_state_year(state.abbr, election_year)
         except Exception as exc:
             print(f"Unable to read county presidential dataset: {exc}")
             return None
+        if df_state is None:
+            return None
 
-        df_state = df[
-            (df["year"] == election_year)
-            & (df["state_po"] == state.abbr)
-            & (df["office"].str.contains("PRESIDENT", case=False, na=False))
-            ]
+        df_state = df_state[df_state["office"].str.contains("PRESIDENT", case=False, na=False)]
         if df_state.empty:
             return None
 
@@ -57,56 +54,142 @@ class CountyPresidentialReturnsProvider:
         if df_state.empty:
             return None
 
-        pivot = (
-            df_state.pivot_table(
-                index="county_fips",
-                columns="party",
-                values="candidatevotes",
-                aggfunc="sum",
-                fill_value=0,
-            )
-            .reset_index()
-            .rename_axis(None, axis=1)
+        votes = (
+            df_state.groupby(["county_fips", "party"])["candidatevotes"]
+            .sum()
+            .unstack("party", fill_value=0)
+            .reindex(columns=["DEMOCRAT", "REPUBLICAN"], fill_value=0)
         )
-        if pivot.empty:
+        dem = votes["DEMOCRAT"].to_numpy()
+        total = dem + votes["REPUBLICAN"].to_numpy()
+        has_votes = total > 0
+        if not has_votes.any():
             return None
 
-        if "DEMOCRAT" not in pivot.columns:
-            pivot["DEMOCRAT"] = 0
-        if "REPUBLICAN" not in pivot.columns:
-            pivot["REPUBLICAN"] = 0
+        # county_fips is 5 digits (e.g. 23001), we need last 3 for 'county' (e.g. 001)
+        return pd.DataFrame(
+            {
+                "county": votes.index[has_votes].str[-3:],
+                "partisan_score": dem[has_votes] / total[has_votes],
+            }
+        )
 
-        pivot["total_votes"] = pivot["DEMOCRAT"] + pivot["REPUBLICAN"]
-        pivot = pivot[pivot["total_votes"] > 0]
-        if pivot.empty:
-            return None
+    def _read_state_year(self, state_abbr: str, election_year: int) -> Optional[pd.DataFrame]:
+        """
+        Reads the rows for one state/year, from the parquet copy when it exists or can be built.
+        An existing parquet copy is used without touching (or downloading) the TSV.
+        """
+        parquet_path = self._cached_parquet_file()
+        if not parquet_path:
+            dataset_path = self._ensure_dataset_file()
+            if not dataset_path:
+                return None
+            parquet_path = self._ensure_parquet_file(dataset_path)
+            if not parquet_path:
+                df = self._read_tsv(dataset_path)
+                return df[(df["year"] == election_year) & (df["state_po"] == state_abbr)]
+        return pd.read_parquet(
+            parquet_path,
+            columns=list(self.DATASET_COLUMNS),
+            filters=[("year", "==", election_year), ("state_po", "==", state_abbr)],
+        )
 
-        # county_fips is 5 digits (e.g. 23001), we need last 3 for 'county' (e.g. 001)
-        pivot["county"] = pivot["county_fips"].str[-3:]
-        pivot["partisan_score"] = pivot["DEMOCRAT"] / pivot["total_votes"]
+    def _read_tsv(self, dataset_path: str) -> pd.DataFrame:
+        return pd.read_csv(
+            dataset_path,
+            sep="\t",
+            usecols=list(self.DATASET_COLUMNS),
+            dtype={"county_fips": str, "year": int, "state_po": str, "party": str, "candidatevotes": int},
+        )
 
-        return pivot[["county", "partisan_score"]]
+    def _cached_parquet_file(self) -> Optional[str]:
+        """
+        Returns the parquet copy if it exists and is not older than a TSV sitting next to it.
+        """
+        dataset_path = os.path.join(self.cache_dir, self.COUNTY_FILE_LABEL)
+        parquet_path = os.path.splitext(dataset_path)[0] + ".parquet"
+        if not os.path.exists(parquet_path):
+            return None
+        if os.path.exists(dataset_path) and os.path.getmtime(parquet_path) < os.path.getmtime(dataset_path):
+            return None
+        return parquet_path
+
+    def _ensure_parquet_file(self, dataset_path: str) -> Optional[str]:
+        """
+        Converts the downloaded TSV to parquet once, sorted by year/state so row-group statistics
+        let the year/state filters skip everything but the requested slice.
+        """
+        parquet_path = os.path.splitext(dataset_path)[0] + ".parquet"
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(dataset_path):
+            return parquet_path
+        try:
+            df = self._read_tsv(dataset_path).sort_values(["year", "state_po"], kind="stable")
+            df.to_parquet(parquet_path, engine="pyarrow", index=False, row_group_size=self.PARQUET_ROW_GROUP_SIZE)
+            return parquet_path
+        except Exception as exc:
+            print(f"Unable to cache county presidential dataset as parquet: {exc}")
+            return None
 
     def _ensure_dataset_file(self) -> Optional[str]:
         """
         Downloads the dataset if necessary and returns the local path.
+        The size and MD5 of each download are recorded in a sidecar .meta.json; a cached file whose
+        size or MD5 no longer matches it (e.g. a truncated or corrupted copy) is downloaded again.
+        This runs only when the parquet copy is missing or stale, so re-hashing the TSV is rare.
         """
         cache_path = os.path.join(self.cache_dir, self.COUNTY_FILE_LABEL)
+        meta_path = f"{cache_path}.meta.json"
         if os.path.exists(cache_path):
-            if os.path.getsize(cache_path) > 0:
+            if self._dataset_file_is_complete(cache_path, meta_path):
                 return cache_path
-            # Corrupt empty file
+            # Corrupt empty or truncated file
             os.remove(cache_path)
 
         print(f"Downloading partisan data from {self.FILE_URL}...")
+        partial_path = f"{cache_path}.part"
         try:
-            response = requests.get(self.FILE_URL, stream=True, timeout=120)
-            response.raise_for_status()
-            with open(cache_path, "wb") as outfile:
-                for chunk in response.iter_content(chunk_size=1024 * 1024):
-                    if chunk:
+            with self.session.get(self.FILE_URL, stream=True, timeout=120) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                digest = hashlib.md5()
+                size = 0
+                with open(partial_path, "wb") as outfile:
+                    while chunk := response.raw.read(self.DOWNLOAD_CHUNK_SIZE):
+                        digest.update(chunk)
                         outfile.write(chunk)
+                        size += len(chunk)
+                expected = response.headers.get("Content-Length")
+                if expected and "Content-Encoding" not in response.headers and int(expected) != size:
+                    raise IOError(f"incomplete download ({size} of {expected} bytes)")
+            os.replace(partial_path, cache_path)
+            with open(meta_path, "w") as fp:
+                json.dump({"url": self.FILE_URL, "size": size, "md5": digest.hexdigest()}, fp)
             return cache_path
         except Exception as exc:
             print(f"Failed to download partisan data: {exc}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
             return None
+
+    @classmethod
+    def _dataset_file_is_complete(cls, cache_path: str, meta_path: str) -> bool:
+        size = os.path.getsize(cache_path)
+        if size == 0:
+            return False
+        try:
+            with open(meta_path, "r") as fp:
+                meta = json.load(fp)
+        except (OSError, ValueError):
+            # Files downloaded before the sidecar existed are trusted as before.
+            return True
+        if meta.get("size") != size:
+            return False
+        return "md5" not in meta or cls._file_md5(cache_path) == meta["md5"]
+
+    @classmethod
+    def _file_md5(cls, path: str) -> str:
+        digest = hashlib.md5()
+        with open(path, "rb") as fp:
+            while chunk := fp.read(cls.DOWNLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest()
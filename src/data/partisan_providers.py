@@ -1,14 +1,28 @@
+import csv
+import functools
+import hashlib
+import json
+import operator
+import os
+import shutil
+import threading
 import zipfile
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import requests
-import us
 import yaml
 
+from ..core.utils import numeric_values
 from .partisan_data import CountyPresidentialReturnsProvider
+from .states import lookup_state
+
+# libyaml's C loader when PyYAML was built with it; same safe semantics as yaml.safe_load.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 AVAILABLE_PARTISAN_YEARS = [2000, 2004, 2008, 2012, 2016, 2020, 2024]
 DEFAULT_PARTISAN_YEAR = 2020
@@ -16,6 +30,20 @@ DEFAULT_PARTISAN_YEAR = 2020
 # Harvard Dataverse US House 2018 precinct-level dataset
 HARVARD_2018_FILE_URL = "https://dataverse.harvard.edu/api/access/datafile/3814252"
 HARVARD_2018_CACHE = Path(".cache") / "harvard_house" / "us-house-precinct-2018.zip"
+HARVARD_HOUSE_COLUMNS = ("state", "fipscode", "dem", "rep")
+
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# One pooled session so repeated downloads across providers reuse connections.
+_http_session = requests.Session()
+
+# Bump when a parser's output changes so stale parsed_*.parquet files are ignored.
+PARSED_CACHE_VERSION = 1
+
+# Parsed provider results keyed by (fetcher_key, state_fips, year), most recently used last.
+SCORE_CACHE_SIZE = 128
+_score_cache: "OrderedDict[Tuple[str, str, Optional[int]], pd.DataFrame]" = OrderedDict()
+_score_cache_lock = threading.Lock()
 
 
 @dataclass(frozen=True)
@@ -26,14 +54,14 @@ class ProviderMetadata:
     confidence: str  # 'High', 'Medium', 'Low'
     description: str
     supports_year_selection: bool
-    available_years: Optional[List[int]]
+    available_years: Optional[Tuple[int, ...]]
     granularity_rank: int  # lower is better (precinct < county)
     base_priority: int = 100
     recency_note: str = ""
     fetcher_key: str = ""
 
 
-_county_returns_provider = CountyPresidentialReturnsProvider()
+_county_returns_provider = CountyPresidentialReturnsProvider(session=_http_session)
 
 MEDSL_BASE_URL = "https://dataverse.harvard.edu/api/access/datafile"
 MEDSL_STATE_FILES: Dict[str, Dict[str, str]] = {
@@ -91,38 +119,134 @@ MEDSL_STATE_FILES: Dict[str, Dict[str, str]] = {
 }
 
 
+def _ensure_cached(url: str, local_file: Path, timeout: int = 60) -> Path:
+    """
+    Downloads url to local_file unless it is already cached, and returns the path.
+    The body is copied from the raw stream into a .part file that only replaces local_file once
+    complete, so a failed download never leaves a truncated file that looks cached.
+    Raises requests.RequestException / OSError on failure.
+    """
+    if local_file.exists():
+        return local_file
+    local_file.parent.mkdir(parents=True, exist_ok=True)
+    partial_file = local_file.with_name(local_file.name + ".part")
+    try:
+        with _http_session.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(partial_file, "wb") as outfile:
+                shutil.copyfileobj(response.raw, outfile, length=DOWNLOAD_CHUNK_SIZE)
+        os.replace(partial_file, local_file)
+    finally:
+        if partial_file.exists():
+            partial_file.unlink()
+    return local_file
+
+
+@functools.lru_cache(maxsize=1)
+def _csv_engine() -> str:
+    """pyarrow's multithreaded CSV parser when installed, otherwise pandas' C parser."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+def _read_columns(path: Path, columns: Iterable[str], sep: str = ",", dtype=None) -> pd.DataFrame:
+    """
+    read_csv restricted to the given columns (those absent from the file are skipped), so the
+    parser never converts the many columns the providers discard.
+    """
+    with open(path, newline="") as fp:
+        header = next(csv.reader(fp, delimiter=sep))
+    wanted = frozenset(columns)
+    usecols = [column for column in header if column in wanted]
+    return pd.read_csv(path, sep=sep, usecols=usecols, dtype=dtype, engine=_csv_engine())
+
+
+def _two_party_scores(county_keys, dem_votes, gop_votes) -> pd.DataFrame:
+    """
+    Sums DEM/GOP votes per county key with a bincount scatter over the factorized keys and
+    returns the (sorted) keys that received two-party votes with their DEM share.
+    Missing keys are dropped and missing votes count as zero.
+    """
+    codes, keys = pd.factorize(county_keys, sort=True)
+    valid = codes >= 0
+    codes = codes[valid]
+    dem = np.bincount(codes, weights=np.nan_to_num(np.asarray(dem_votes, dtype=np.float64)[valid]), minlength=len(keys))
+    gop = np.bincount(codes, weights=np.nan_to_num(np.asarray(gop_votes, dtype=np.float64)[valid]), minlength=len(keys))
+    total = dem + gop
+    has_votes = total > 0
+    return pd.DataFrame({"county": keys[has_votes], "partisan_score": dem[has_votes] / total[has_votes]})
+
+
+def _medsl_state_file(state) -> Optional[Tuple[str, Path]]:
+    info = MEDSL_STATE_FILES.get(state.abbr)
+    if not info:
+        return None
+    cache_dir = Path(".cache") / "medsl_state" / state.abbr.lower()
+    return f"{MEDSL_BASE_URL}/{info['id']}", cache_dir / f"{state.abbr.lower()}_{info['id']}{info['ext']}"
+
+
 def _fetch_county_returns(state_fips: str, election_year: Optional[int]) -> Optional[pd.DataFrame]:
     year = election_year or DEFAULT_PARTISAN_YEAR
     return _county_returns_provider.get_state_scores(state_fips, year)
 
 
+def _cached_parse(source_file: Path, parsed_file: Path,
+                  parse: Callable[[], Optional[pd.DataFrame]]) -> Optional[pd.DataFrame]:
+    """
+    Returns the provider result stored in parsed_file when it is at least as new as source_file;
+    otherwise runs parse() and stores its result there. Results are one row per county, so the
+    parquet copy is tiny and spares later runs the source parse and groupby.
+    """
+    if parsed_file.exists() and parsed_file.stat().st_mtime_ns >= source_file.stat().st_mtime_ns:
+        try:
+            return pd.read_parquet(parsed_file)
+        except Exception as exc:
+            print(f"Ignoring unreadable parsed cache {parsed_file}: {exc}")
+    result = parse()
+    if result is not None:
+        try:
+            result.to_parquet(parsed_file, index=False, compression="zstd")
+        except Exception as exc:
+            print(f"Unable to write parsed cache {parsed_file}: {exc}")
+    return result
+
+
+def _parsed_cache_name(*parts) -> str:
+    return "_".join(["parsed", *map(str, parts), f"v{PARSED_CACHE_VERSION}"]) + ".parquet"
+
+
 def _fetch_medsl_state_returns(state_fips: str, _unused_year: Optional[int]) -> Optional[pd.DataFrame]:
-    state = us.states.lookup(state_fips)
+    state = lookup_state(state_fips)
     if not state:
         return None
-    info = MEDSL_STATE_FILES.get(state.abbr)
-    if not info:
+    source = _medsl_state_file(state)
+    if not source:
         return None
-    cache_dir = Path(".cache") / "medsl_state" / state.abbr.lower()
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    local_file = cache_dir / f"{state.abbr.lower()}_{info['id']}{info['ext']}"
-    if not local_file.exists():
-        url = f"{MEDSL_BASE_URL}/{info['id']}"
-        try:
-            response = requests.get(url, stream=True, timeout=60)
-            response.raise_for_status()
-            with open(local_file, "wb") as outfile:
-                for chunk in response.iter_content(chunk_size=1024 * 1024):
-                    if chunk:
-                        outfile.write(chunk)
-        except requests.RequestException as exc:
-            print(f"Failed to download MEDSL state file for {state.abbr}: {exc}")
-            return None
-    delimiter = "\t" if info['ext'] == ".tab" else ","
+    url, local_file = source
+    try:
+        _ensure_cached(url, local_file)
+    except (requests.RequestException, OSError) as exc:
+        print(f"Failed to download MEDSL state file for {state.abbr}: {exc}")
+        return None
+    return _cached_parse(local_file, local_file.with_name(_parsed_cache_name()),
+                         lambda: _parse_medsl_state_file(local_file, state.abbr))
+
+
+def _parse_medsl_state_file(local_file: Path, state_abbr: str) -> Optional[pd.DataFrame]:
+    delimiter = "\t" if local_file.suffix == ".tab" else ","
     try:
-        medsl_df = pd.read_csv(local_file, sep=delimiter, dtype={'county_fips': str})
+        medsl_df = _read_columns(
+            local_file,
+            ('office', 'party', 'party_simplified', 'votes', 'candidatevotes', 'county_fips'),
+            sep=delimiter,
+            dtype={'county_fips': str},
+        )
     except Exception as exc:
-        print(f"Unable to parse MEDSL state file for {state.abbr}: {exc}")
+        print(f"Unable to parse MEDSL state file for {state_abbr}: {exc}")
         return None
     presidential = medsl_df[
         medsl_df['office'].str.contains('PRESIDENT', case=False, na=False)
@@ -135,78 +259,71 @@ def _fetch_medsl_state_returns(state_fips: str, _unused_year: Optional[int]) ->
     if presidential.empty:
         return None
     vote_col = 'votes' if 'votes' in presidential.columns else 'candidatevotes'
-    grouped = (
-        presidential.groupby(['county_fips', party_col])[vote_col]
-        .sum()
-        .unstack(fill_value=0)
+    votes = presidential[vote_col].to_numpy(dtype=np.float64)
+    is_dem = (presidential[party_col] == 'DEMOCRAT').to_numpy()
+    result = _two_party_scores(
+        presidential['county_fips'].to_numpy(), np.where(is_dem, votes, 0.0), np.where(is_dem, 0.0, votes)
     )
-    if 'DEMOCRAT' not in grouped.columns:
-        grouped['DEMOCRAT'] = 0
-    if 'REPUBLICAN' not in grouped.columns:
-        grouped['REPUBLICAN'] = 0
-    grouped['total'] = grouped.sum(axis=1)
-    grouped = grouped[grouped['total'] > 0]
-    grouped['partisan_score'] = grouped['DEMOCRAT'] / grouped['total']
-    result = grouped[['partisan_score']].reset_index()
-    result.rename(columns={'county_fips': 'county'}, inplace=True)
     result['county'] = result['county'].astype(str).str.zfill(3)
     return result
 
 
 def _ensure_harvard_house_zip() -> Optional[Path]:
-    HARVARD_2018_CACHE.parent.mkdir(parents=True, exist_ok=True)
-    if HARVARD_2018_CACHE.exists():
-        return HARVARD_2018_CACHE
     try:
-        response = requests.get(HARVARD_2018_FILE_URL, stream=True, timeout=60)
-        response.raise_for_status()
-        with open(HARVARD_2018_CACHE, "wb") as outfile:
-            for chunk in response.iter_content(chunk_size=1024 * 1024):
-                if chunk:
-                    outfile.write(chunk)
-        return HARVARD_2018_CACHE
-    except requests.RequestException as exc:
+        return _ensure_cached(HARVARD_2018_FILE_URL, HARVARD_2018_CACHE)
+    except (requests.RequestException, OSError) as exc:
         print(f"Failed to download Harvard 2018 dataset: {exc}")
         return None
 
 
+@functools.lru_cache(maxsize=1)
+def _read_harvard_house_frame(zip_path: str, _mtime_ns: int) -> pd.DataFrame:
+    """
+    The national-wide table is parsed once and shared by every state; the mtime in the key
+    makes a re-downloaded archive parse again. Only the columns used here are parsed, rows
+    without a county FIPS are dropped, and the county number (fipscode % 1000) is derived once.
+    """
+    with zipfile.ZipFile(zip_path, "r") as archive:
+        with archive.open("national-files/us-house-wide.csv") as file_obj:
+            df = pd.read_csv(
+                file_obj, usecols=list(HARVARD_HOUSE_COLUMNS), dtype={"fipscode": float}, engine=_csv_engine()
+            )
+    df = df.dropna(subset=["fipscode"])
+    return df.assign(county=df["fipscode"].to_numpy(dtype=np.int64) % 1000)
+
+
 def _fetch_harvard_house_2018(state_fips: str, election_year: Optional[int]) -> Optional[pd.DataFrame]:
     if election_year is not None and election_year != 2018:
         return None
-    state = us.states.lookup(state_fips)
+    state = lookup_state(state_fips)
     if not state:
         return None
     zip_path = _ensure_harvard_house_zip()
     if not zip_path:
         return None
+    return _cached_parse(zip_path, zip_path.with_name(_parsed_cache_name(state.abbr.lower())),
+                         lambda: _parse_harvard_house_state(zip_path, state.abbr))
+
+
+def _parse_harvard_house_state(zip_path: Path, state_abbr: str) -> Optional[pd.DataFrame]:
     try:
-        with zipfile.ZipFile(zip_path, "r") as archive:
-            with archive.open("national-files/us-house-wide.csv") as file_obj:
-                df = pd.read_csv(file_obj, dtype={"fipscode": float})
+        df = _read_harvard_house_frame(str(zip_path), zip_path.stat().st_mtime_ns)
     except Exception as exc:
         print(f"Unable to read Harvard 2018 dataset: {exc}")
         return None
-    df_state = df[df["state"] == state.abbr]
+    df_state = df[df["state"] == state_abbr]
     if df_state.empty:
         return None
-    df_state = df_state[pd.notna(df_state["fipscode"])]
-    if df_state.empty:
-        return None
-    df_state["county_fips"] = df_state["fipscode"].astype(int).astype(str).str.zfill(5)
-    df_state["county"] = df_state["county_fips"].str[-3:]
-    df_state["votes_DEM"] = pd.to_numeric(df_state.get("dem"), errors="coerce").fillna(0)
-    df_state["votes_GOP"] = pd.to_numeric(df_state.get("rep"), errors="coerce").fillna(0)
-    grouped = (
-        df_state.groupby("county")[["votes_DEM", "votes_GOP"]]
-        .sum()
-        .reset_index()
+    grouped = _two_party_scores(
+        df_state["county"].to_numpy(),
+        numeric_values(df_state["dem"], 0),
+        numeric_values(df_state["rep"], 0),
     )
-    grouped["total"] = grouped["votes_DEM"] + grouped["votes_GOP"]
-    grouped = grouped[grouped["total"] > 0]
     if grouped.empty:
         return None
-    grouped["partisan_score"] = grouped["votes_DEM"] / grouped["total"]
-    return grouped[["county", "partisan_score"]]
+    # Aggregated on integers; only the few distinct county numbers are formatted as 3-digit codes.
+    grouped["county"] = np.char.zfill(grouped["county"].to_numpy().astype(str), 3)
+    return grouped
 
 
 def parse_precinct_csv(entry, state_fips: str, election_year: Optional[int]) -> Optional[pd.DataFrame]:
@@ -214,62 +331,86 @@ def parse_precinct_csv(entry, state_fips: str, election_year: Optional[int]) ->
         return None
     if election_year is not None and entry.get("year") and entry["year"] != election_year:
         return None
-    state = us.states.lookup(state_fips)
+    state = lookup_state(state_fips)
     if not state:
         return None
     cache_dir = Path(".cache") / "metadata_sources" / entry.get("provider_key", "source")
-    cache_dir.mkdir(parents=True, exist_ok=True)
     local_file = cache_dir / Path(entry["url"]).name
-    if not local_file.exists():
-        try:
-            response = requests.get(entry["url"], stream=True, timeout=60)
-            response.raise_for_status()
-            with open(local_file, "wb") as outfile:
-                for chunk in response.iter_content(chunk_size=1024 * 1024):
-                    if chunk:
-                        outfile.write(chunk)
-        except requests.RequestException as exc:
-            print(f"Failed to fetch metadata provider {entry.get('provider_key')}: {exc}")
-            return None
     try:
-        df = pd.read_csv(local_file)
+        _ensure_cached(entry["url"], local_file)
+    except (requests.RequestException, OSError) as exc:
+        print(f"Failed to fetch metadata provider {entry.get('provider_key')}: {exc}")
+        return None
+    # The result depends on the entry's field mapping too, so a digest of it is part of the name.
+    entry_digest = hashlib.md5(json.dumps(entry, sort_keys=True, default=str).encode()).hexdigest()[:8]
+    return _cached_parse(local_file, cache_dir / _parsed_cache_name(state_fips, entry_digest),
+                         lambda: _parse_precinct_file(local_file, entry, state))
+
+
+COUNTY_NAME_SUFFIXES = (" COUNTY", " PARISH", " BOROUGH", " MUNICIPIO", " CITY")
+
+
+@functools.lru_cache(maxsize=64)
+def _county_fips_by_name(state_fips: str) -> Dict[str, str]:
+    """
+    Upper-cased county name -> county FIPS for a state, built once per state. Names are also
+    reachable without their " County"/" Parish"/... suffix, as precinct files often omit it,
+    unless the short form is ambiguous (e.g. Baltimore County vs. Baltimore city).
+    """
+    lookup = {county.name.upper(): county.fips for county in lookup_state(state_fips).counties}
+    aliases: Dict[str, Optional[str]] = {}
+    for name, fips in lookup.items():
+        for suffix in COUNTY_NAME_SUFFIXES:
+            if name.endswith(suffix):
+                short = name[: -len(suffix)]
+                aliases[short] = None if short in aliases else fips
+    for short, fips in aliases.items():
+        if fips is not None and short not in lookup:
+            lookup[short] = fips
+    return lookup
+
+
+def _parse_precinct_file(local_file: Path, entry, state) -> Optional[pd.DataFrame]:
+    county_col = entry.get("county_field", "county")
+    party_col = entry.get("party_field", "party")
+    vote_fields = entry.get("vote_fields", ["votes"])
+    try:
+        df = _read_columns(local_file, [county_col, party_col, *vote_fields])
     except Exception as exc:
         print(f"Unable to parse metadata provider CSV {entry.get('provider_key')}: {exc}")
         return None
-    county_col = entry.get("county_field", "county")
     if county_col not in df.columns:
         return None
-    party_col = entry.get("party_field", "party")
     if party_col not in df.columns:
         return None
-    vote_fields = entry.get("vote_fields", ["votes"])
+    total_votes = np.zeros(len(df))
     for col in vote_fields:
-        if col not in df.columns:
-            df[col] = 0
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-    df["total_votes"] = df[vote_fields].sum(axis=1)
+        if col in df.columns:
+            total_votes += numeric_values(df[col], 0)
+    df["total_votes"] = total_votes
     df = df[df["total_votes"] > 0]
     if df.empty:
         return None
-    county_lookup = {county.name.upper(): county.fips for county in state.counties}
-    df["county_fips"] = df[county_col].astype(str).str.upper().map(county_lookup)
+    df["county_fips"] = df[county_col].astype(str).str.upper().map(_county_fips_by_name(state.fips))
     df = df[pd.notna(df["county_fips"])]
     if df.empty:
         return None
-    party_series = df[party_col].astype(str).str.upper()
     dem_token = entry.get("dem_token", "DEM").upper()
     gop_token = entry.get("gop_token", "REP").upper()
-    dem_mask = party_series.str.contains(dem_token)
-    gop_mask = party_series.str.contains(gop_token)
-    dem_votes = df[dem_mask].groupby("county_fips")["total_votes"].sum()
-    gop_votes = df[gop_mask].groupby("county_fips")["total_votes"].sum()
-    grouped = pd.DataFrame({"votes_DEM": dem_votes, "votes_GOP": gop_votes}).fillna(0)
-    grouped = grouped[(grouped["votes_DEM"] + grouped["votes_GOP"]) > 0]
+    # Party labels repeat heavily, so match the tokens once per distinct label and
+    # scatter each row's votes into per-county DEM/GOP totals.
+    party_codes, parties = pd.factorize(df[party_col].astype(str).str.upper())
+    labels = parties.to_numpy(dtype=str)
+    is_dem = np.char.find(labels, dem_token)[party_codes] >= 0
+    is_gop = np.char.find(labels, gop_token)[party_codes] >= 0
+    total_votes = df["total_votes"].to_numpy(dtype=np.float64)
+    grouped = _two_party_scores(
+        df["county_fips"].to_numpy(), np.where(is_dem, total_votes, 0.0), np.where(is_gop, total_votes, 0.0)
+    )
     if grouped.empty:
         return None
-    grouped["county"] = grouped.index.astype(str).str[-3:]
-    grouped["partisan_score"] = grouped["votes_DEM"] / (grouped["votes_DEM"] + grouped["votes_GOP"])
-    return grouped.reset_index(drop=True)[["county", "partisan_score"]]
+    grouped["county"] = grouped["county"].astype(str).str[-3:]
+    return grouped
 
 
 FETCHER_MAP: Dict[str, Callable[[str, Optional[int]], Optional[pd.DataFrame]]] = {
@@ -286,7 +427,7 @@ PROVIDER_REGISTRY: Dict[str, ProviderMetadata] = {
         confidence="High",
         description="Certified presidential results aggregated to counties (2000-2024).",
         supports_year_selection=True,
-        available_years=AVAILABLE_PARTISAN_YEARS,
+        available_years=tuple(AVAILABLE_PARTISAN_YEARS),
         granularity_rank=2,
         base_priority=100,
         recency_note="Supports any general election year from 2000 through 2024.",
@@ -299,7 +440,7 @@ PROVIDER_REGISTRY: Dict[str, ProviderMetadata] = {
         confidence="High",
         description="State-level presidential returns published by MEDSL for 2020, downloaded per state.",
         supports_year_selection=False,
-        available_years=[2020],
+        available_years=(2020,),
         granularity_rank=1,
         base_priority=50,
         recency_note="Certified 2020 general election",
@@ -312,7 +453,7 @@ PROVIDER_REGISTRY: Dict[str, ProviderMetadata] = {
         confidence="Medium",
         description="County-level US House results from the Harvard Dataverse 2018 general dataset.",
         supports_year_selection=False,
-        available_years=[2018],
+        available_years=(2018,),
         granularity_rank=2,
         base_priority=120,
         recency_note="Certified 2018 US House results",
@@ -326,15 +467,20 @@ METADATA_PARSER_DISPATCH = {
     "precinct_csv": parse_precinct_csv,
 }
 
+# Metadata-defined provider keys per state FIPS, filled by _register_metadata_providers.
+STATE_PROVIDER_KEYS: Dict[str, List[str]] = {}
+
 
 def _register_metadata_providers():
+    STATE_PROVIDER_KEYS.clear()
     for entry in _load_metadata_providers():
+        STATE_PROVIDER_KEYS.setdefault(entry["state_fips"], []).append(entry["provider_key"])
         parser_name = entry.get("parser")
         parser = METADATA_PARSER_DISPATCH.get(parser_name)
         if not parser:
             continue
         provider_key = entry["provider_key"]
-        available_years = [entry["year"]] if entry.get("year") else None
+        available_years = (entry["year"],) if entry.get("year") else None
 
         def fetcher(state_fips, election_year, entry=entry, parser=parser):
             return parser(entry, state_fips, election_year)
@@ -353,20 +499,22 @@ def _register_metadata_providers():
             recency_note=entry.get("recency_note", ""),
             fetcher_key=provider_key,
         )
+    # Registry changed; drop any memoized chains and results computed against the old one.
+    provider_chain_for_state.cache_clear()
+    available_manual_providers.cache_clear()
+    invalidate_provider_cache()
 
 
 def _state_specific_provider_keys(state_fips: Optional[str]) -> List[str]:
     if not state_fips:
         return []
-    state = us.states.lookup(state_fips)
+    state = lookup_state(state_fips)
     if not state:
         return []
     keys: List[str] = []
     if state.abbr in MEDSL_STATE_FILES:
         keys.append("medsl_state_2020")
-    for entry in _load_metadata_providers():
-        if entry.get("state_fips") == state.fips:
-            keys.append(entry.get("provider_key"))
+    keys.extend(STATE_PROVIDER_KEYS.get(state.fips, ()))
     return keys
 
 
@@ -376,17 +524,21 @@ def _year_distance(meta: ProviderMetadata, requested_year: Optional[int]) -> int
     return min(abs(year - requested_year) for year in meta.available_years)
 
 
+@functools.lru_cache(maxsize=256)
 def provider_chain_for_state(state_fips: Optional[str], requested_year: Optional[int],
-                             manual_override_key: Optional[str] = None) -> List[ProviderMetadata]:
+                             manual_override_key: Optional[str] = None) -> Tuple[ProviderMetadata, ...]:
     """
-    Returns an ordered list of provider metadata representing the hierarchy to attempt.
+    Returns an ordered tuple of provider metadata representing the hierarchy to attempt.
+    Results are memoized; the registry is fully populated at import time.
     """
     if manual_override_key:
         meta = PROVIDER_REGISTRY.get(manual_override_key)
-        return [meta] if meta else []
+        return (meta,) if meta else ()
 
-    candidate_keys = _state_specific_provider_keys(state_fips) + GLOBAL_PROVIDER_KEYS
-    candidates: List[tuple] = []
+    # A key always maps to the same metadata (and score), so dedupe the keys before scoring;
+    # the stable sort keeps first-listed order among equal scores.
+    candidate_keys = dict.fromkeys(_state_specific_provider_keys(state_fips) + GLOBAL_PROVIDER_KEYS)
+    candidates: List[Tuple[Tuple[int, int, int], ProviderMetadata]] = []
     for key in candidate_keys:
         meta = PROVIDER_REGISTRY.get(key)
         if not meta:
@@ -395,28 +547,24 @@ def provider_chain_for_state(state_fips: Optional[str], requested_year: Optional
         score = (meta.granularity_rank, year_distance, meta.base_priority)
         candidates.append((score, meta))
 
-    candidates.sort(key=lambda item: item[0])
-    ordered: List[ProviderMetadata] = []
-    seen = set()
-    for _, meta in candidates:
-        if meta.key in seen:
-            continue
-        seen.add(meta.key)
-        ordered.append(meta)
+    candidates.sort(key=operator.itemgetter(0))
+    ordered: List[ProviderMetadata] = [meta for _, meta in candidates]
 
     if not ordered:
         fallback = PROVIDER_REGISTRY.get("county_presidential")
         if fallback:
             ordered.append(fallback)
 
-    return ordered
+    return tuple(ordered)
 
 
 def get_provider_metadata(key: str) -> Optional[ProviderMetadata]:
     return PROVIDER_REGISTRY.get(key)
 
 
-def available_manual_providers(state_fips: Optional[str], requested_year: Optional[int]) -> List[ProviderMetadata]:
+@functools.lru_cache(maxsize=256)
+def available_manual_providers(state_fips: Optional[str],
+                               requested_year: Optional[int]) -> Tuple[ProviderMetadata, ...]:
     """
     Returns all providers applicable to the given state for manual override selection.
     """
@@ -426,10 +574,36 @@ def available_manual_providers(state_fips: Optional[str], requested_year: Option
 
 def fetch_scores_for_provider(meta: ProviderMetadata, state_fips: str, election_year: Optional[int]) -> Optional[
     pd.DataFrame]:
+    """
+    Returns the provider's ['county', 'partisan_score'] frame, memoized per (provider, state, year).
+    Callers receive a shallow copy, so adding or replacing columns never touches the cached frame.
+    Failed fetches (None) are not cached, so a later call can retry.
+    """
     fetcher = FETCHER_MAP.get(meta.fetcher_key)
     if not fetcher:
         return None
-    return fetcher(state_fips, election_year if meta.supports_year_selection else None)
+    year = election_year if meta.supports_year_selection else None
+    key = (meta.fetcher_key, state_fips, year)
+    with _score_cache_lock:
+        scores = _score_cache.get(key)
+        if scores is not None:
+            _score_cache.move_to_end(key)
+            return scores.copy(deep=False)
+    scores = fetcher(state_fips, year)
+    if scores is None:
+        return None
+    with _score_cache_lock:
+        _score_cache[key] = scores
+        if len(_score_cache) > SCORE_CACHE_SIZE:
+            _score_cache.popitem(last=False)
+    return scores.copy(deep=False)
+
+
+def invalidate_provider_cache():
+    """Drops memoized provider results and parsed source tables (e.g. after the on-disk cache is cleared)."""
+    with _score_cache_lock:
+        _score_cache.clear()
+    _read_harvard_house_frame.cache_clear()
 
 
 def allocate_partisan_to_geoid(base_df: pd.DataFrame) -> pd.DataFrame:
@@ -439,13 +613,18 @@ def allocate_partisan_to_geoid(base_df: pd.DataFrame) -> pd.DataFrame:
     return base_df
 
 
+METADATA_PROVIDERS_PATH = Path("data/provider_sources.yaml")
+
+
 def _load_metadata_providers():
-    metadata_path = Path("data/provider_sources.yaml")
-    if not metadata_path.exists():
+    """
+    Parses the provider YAML; called once, when the providers are registered at import.
+    """
+    if not METADATA_PROVIDERS_PATH.exists():
         return []
     try:
-        with open(metadata_path, "r") as file_obj:
-            entries = yaml.safe_load(file_obj) or []
+        with open(METADATA_PROVIDERS_PATH, "r") as file_obj:
+            entries = yaml.load(file_obj, Loader=_YAML_LOADER) or []
     except Exception as exc:
         print(f"Unable to load provider metadata: {exc}")
         return []
@@ -454,7 +633,7 @@ def _load_metadata_providers():
         required = ("state", "provider_key", "url")
         if not all(field in entry for field in required):
             continue
-        state = us.states.lookup(entry["state"])
+        state = lookup_state(entry["state"])
         if not state:
             continue
         entry["state_fips"] = state.fips
@@ -0,0 +1,28 @@
+import functools
+from typing import Optional
+
+import us
+
+# Exact FIPS codes and abbreviations, built once; these are what every hot-path caller passes.
+# Later entries win, matching the scan order of us.states.lookup.
+_STATES_BY_CODE = {
+    **{state.fips: state for state in us.states.STATES_AND_TERRITORIES},
+    **{state.abbr: state for state in us.states.STATES_AND_TERRITORIES},
+}
+
+
+def lookup_state(value: str) -> Optional[us.states.State]:
+    """
+    us.states.lookup with a precomputed table for exact FIPS codes and abbreviations;
+    anything else (lowercase abbreviations, fuzzy state names) goes through the memoized lookup.
+    """
+    state = _STATES_BY_CODE.get(value)
+    if state is not None:
+        return state
+    return _lookup_state_fuzzy(value)
+
+
+@functools.lru_cache(maxsize=64)
+def _lookup_state_fuzzy(value: str) -> Optional[us.states.State]:
+    """Unlike the library's own cache, misses and name lookups are cached too."""
+    return us.states.lookup(value)
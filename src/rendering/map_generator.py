@@ -1,45 +1,160 @@
+import io
+import os
+
 import geopandas as gpd
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+import shapely
+
+from ..core.utils import coverage_union
+
+DEFAULT_FIGSIZE = (10, 10)
+DEFAULT_DPI = 100
+# US National Atlas Equal Area; used for display when the data is in a geographic CRS.
+DISPLAY_EPSG = 2163
+# Above this many polygons (i.e. undissolved units), skip per-polygon edge strokes.
+EDGE_STROKE_MAX_FEATURES = 2000
+# Vertices closer than this many output pixels are dropped before plotting.
+SIMPLIFY_PIXELS = 2
+# Export format by file extension; export_driver rejects any other extension.
+EXPORT_DRIVERS = {".gpkg": "GPKG", ".parquet": "Parquet", ".shp": "ESRI Shapefile"}
+
+
+def export_driver(output_path) -> str:
+    """Vector driver for output_path's extension; raises ValueError for a missing or unknown one."""
+    extension = os.path.splitext(output_path)[1].lower()
+    try:
+        return EXPORT_DRIVERS[extension]
+    except KeyError:
+        supported = ", ".join(EXPORT_DRIVERS)
+        found = f"extension {extension!r}" if extension else "no extension"
+        raise ValueError(f"Cannot export to {output_path}: {found}; use one of {supported}.") from None
 
 
 class MapGenerator:
-    def __init__(self, districts_gdf):
+    def __init__(self, districts_gdf, figsize=DEFAULT_FIGSIZE, dpi=DEFAULT_DPI):
+        self.figsize = figsize
+        self.dpi = dpi
         self.districts_gdf = districts_gdf
 
+    @property
+    def districts_gdf(self) -> gpd.GeoDataFrame:
+        return self._districts_gdf
+
+    @districts_gdf.setter
+    def districts_gdf(self, value):
+        # Reassigning the frame invalidates everything derived from it.
+        self._districts_gdf = value
+        self._sindex = None
+        self._png_cache = None
+        self._dissolved_gdf = None
+        self._display_gdf = None
+
+    @property
+    def sindex(self):
+        """STRtree index over districts_gdf, built on first use."""
+        if self._sindex is None:
+            self._sindex = self.districts_gdf.sindex
+        return self._sindex
+
+    def query(self, geom, predicate="intersects") -> gpd.GeoDataFrame:
+        """Return the rows of districts_gdf whose geometry satisfies predicate against geom."""
+        idxs = self.sindex.query(geom, predicate=predicate)
+        return self.districts_gdf.iloc[idxs]
+
     def _dissolved_districts(self) -> gpd.GeoDataFrame:
         """Return district-level polygons with weighted partisan scores when available."""
         gdf = self.districts_gdf
         if "district_id" not in gdf.columns:
             return gdf
-        work = gdf.copy()
-        if "P1_001N" in work.columns:
-            work["__pop"] = pd.to_numeric(work["P1_001N"], errors="coerce").fillna(0)
+        if "P1_001N" in gdf.columns:
+            pop = pd.to_numeric(gdf["P1_001N"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
         else:
-            work["__pop"] = 1.0
-        if "partisan_score" in work.columns:
-            work["__score"] = pd.to_numeric(work["partisan_score"], errors="coerce").fillna(0.5)
+            pop = np.ones(len(gdf))
+        if "partisan_score" in gdf.columns:
+            score = pd.to_numeric(gdf["partisan_score"], errors="coerce").fillna(0.5).to_numpy(dtype=np.float64)
         else:
-            work["__score"] = 0.5
-
-        dissolved = work.dissolve(by="district_id", aggfunc={"__pop": "sum"})
-        weighted_num = (work["__score"] * work["__pop"]).groupby(work["district_id"]).sum()
-        weighted_den = work["__pop"].groupby(work["district_id"]).sum().replace({0: pd.NA})
-        weighted = (weighted_num / weighted_den).fillna(0.5)
-        dissolved["partisan_score"] = weighted.reindex(dissolved.index).values
-        dissolved.reset_index(inplace=True)
+            score = np.full(len(gdf), 0.5)
+
+        # Each district's units are merged with the shared coverage union (full-union fallback for
+        # input that is not a clean coverage); both sums come from one pass over the factorized ids.
+        codes, district_ids = pd.factorize(gdf["district_id"])
+        valid = codes >= 0
+        pop, score, codes = pop[valid], score[valid], codes[valid]
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes, minlength=len(district_ids))
+        parts = np.split(np.asarray(gdf.geometry.array)[valid][order], np.cumsum(counts)[:-1])
+        pop_sum = np.bincount(codes, weights=pop, minlength=len(district_ids))
+        weighted_num = np.bincount(codes, weights=score * pop, minlength=len(district_ids))
+        weighted = np.full(len(district_ids), 0.5)
+        np.divide(weighted_num, pop_sum, out=weighted, where=pop_sum != 0)
+        geometry = gdf.geometry.name
+        dissolved = gpd.GeoDataFrame(
+            {
+                "district_id": district_ids,
+                geometry: [coverage_union(part) for part in parts],
+                "__pop": pop_sum,
+                "partisan_score": weighted,
+            },
+            geometry=geometry,
+            crs=gdf.crs,
+        )
+        # Same row order as GeoDataFrame.dissolve (sorted by district id).
+        dissolved = dissolved.sort_values("district_id", kind="stable", ignore_index=True)
         return dissolved
 
+    def dissolved_districts(self) -> gpd.GeoDataFrame:
+        """District-level polygons (see _dissolved_districts), computed once per districts_gdf."""
+        if self._dissolved_gdf is None:
+            self._dissolved_gdf = self._dissolved_districts()
+        return self._dissolved_gdf
+
+    def _projected_display(self) -> gpd.GeoDataFrame:
+        """Dissolved districts in a projected CRS, computed once per districts_gdf."""
+        if self._display_gdf is None:
+            display_gdf = self.dissolved_districts()
+            if display_gdf.crs is not None and display_gdf.crs.is_geographic:
+                display_gdf = display_gdf.to_crs(epsg=DISPLAY_EPSG)
+            self._display_gdf = display_gdf
+        return self._display_gdf
+
     def generate_map_image(self, output_path):
         """
         Generates a map image from the districts GeoDataFrame.
+        - output_path may be a file path or a writable binary buffer (e.g. io.BytesIO).
+        - The rendered PNG is cached; repeated calls for the same districts_gdf reuse it.
+        """
+        png = self.render_png()
+        if hasattr(output_path, "write"):
+            output_path.write(png)
+        else:
+            with open(output_path, "wb") as fp:
+                fp.write(png)
+        return output_path
+
+    def render_png(self) -> bytes:
+        """
+        Renders the districts to PNG bytes.
         - If district_id present, dissolve to district polygons.
         - If partisan_score present, shade red/blue by partisan_score (0=R,1=D).
         """
-        display_gdf = self._dissolved_districts()
+        if self._png_cache is not None:
+            return self._png_cache
+        # matplotlib is imported on first render to keep it off the startup path. The Figure API
+        # with an explicit Agg canvas avoids pyplot's global figure manager, so rendering is safe
+        # on worker threads and nothing needs closing afterwards.
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
 
-        fig, ax = plt.subplots(1, 1, figsize=(10, 10))
-        plot_kwargs = {"ax": ax, "edgecolor": "black"}
+        display_gdf = self._projected_display()
+
+        fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1)
+        if len(display_gdf) > EDGE_STROKE_MAX_FEATURES:
+            plot_kwargs = {"ax": ax, "edgecolor": "none", "linewidth": 0}
+        else:
+            plot_kwargs = {"ax": ax, "edgecolor": "black"}
         if "partisan_score" in display_gdf.columns:
             plot_kwargs.update(
                 {
@@ -54,33 +169,115 @@ class MapGenerator:
         else:
             plot_kwargs.update({"cmap": "viridis"})
 
-        # Reproject to US National Atlas Equal Area for better shape (if not already projected)
-        if display_gdf.crs.is_geographic:
-            display_gdf = display_gdf.to_crs(epsg=2163)
+        display_gdf = self._simplified_for_display(display_gdf, max(self.figsize) * self.dpi)
 
-        display_gdf.plot(**plot_kwargs)
+        if len(display_gdf) > EDGE_STROKE_MAX_FEATURES and "column" in plot_kwargs:
+            # geopandas builds a matplotlib Patch per polygon; for undissolved units that dominates
+            # the render, so hand Agg one collection built straight from the coordinate arrays.
+            self._add_polygon_collection(ax, display_gdf, plot_kwargs)
+        else:
+            display_gdf.plot(**plot_kwargs)
         ax.set_axis_off()
-        plt.savefig(output_path, bbox_inches="tight")
-        plt.close(fig)
-        return output_path
+        buffer = io.BytesIO()
+        canvas.print_figure(buffer, format="png", dpi=self.dpi, bbox_inches="tight")
+        self._png_cache = buffer.getvalue()
+        return self._png_cache
+
+    @staticmethod
+    def _add_polygon_collection(ax, gdf, plot_kwargs):
+        """Draws gdf's polygons filled by plot_kwargs["column"] as a single PathCollection."""
+        from matplotlib.collections import PathCollection
+        from matplotlib.colors import Normalize
+        from matplotlib.path import Path
 
-    def export_to_shapefile(self, output_path):
+        values = pd.to_numeric(gdf[plot_kwargs["column"]], errors="coerce").to_numpy(dtype=np.float64)
+        parts, part_owner = shapely.get_parts(gdf.geometry.values, return_index=True)
+        keep = (shapely.get_type_id(parts) == shapely.GeometryType.POLYGON) & ~shapely.is_empty(parts)
+        parts, part_owner = parts[keep], part_owner[keep]
+        rings, ring_part = shapely.get_rings(parts, return_index=True)
+        coords, vertex_ring = shapely.get_coordinates(rings, return_index=True)
+
+        # Each ring is MOVETO ... CLOSEPOLY; a polygon's exterior and holes form one compound path.
+        ring_ends = np.cumsum(np.bincount(vertex_ring, minlength=len(rings)))
+        ring_starts = ring_ends - np.diff(ring_ends, prepend=0)
+        codes = np.full(len(coords), Path.LINETO, dtype=Path.code_type)
+        codes[ring_starts] = Path.MOVETO
+        codes[ring_ends - 1] = Path.CLOSEPOLY
+        part_ends = ring_ends[np.cumsum(np.bincount(ring_part, minlength=len(parts))) - 1]
+        part_starts = np.concatenate(([0], part_ends[:-1]))
+        paths = [Path(coords[start:end], codes[start:end]) for start, end in zip(part_starts, part_ends)]
+
+        part_values = values[part_owner]
+        vmin = plot_kwargs.get("vmin", np.nanmin(values) if len(values) else 0)
+        vmax = plot_kwargs.get("vmax", np.nanmax(values) if len(values) else 1)
+        collection = PathCollection(
+            paths,
+            array=part_values,
+            cmap=plot_kwargs["cmap"],
+            norm=Normalize(vmin=vmin, vmax=vmax),
+            edgecolor="none",
+            linewidth=0,
+        )
+        ax.add_collection(collection)
+        ax.autoscale_view()
+        ax.set_aspect("equal")
+
+    @staticmethod
+    def _simplified_for_display(gdf, pixels) -> gpd.GeoDataFrame:
         """
-        Exports dissolved district polygons (if available) to a shapefile.
+        Copy of gdf with geometry simplified below the output pixel size; export keeps full detail.
+        Districts (and units) form a coverage, so they are simplified together: shared edges are
+        simplified once and stay shared instead of opening slivers or doubling up.
         """
-        gdf = self._dissolved_districts().copy()
-        # Shapefile field name limit is 10 chars; shorten to avoid warnings.
+        if gdf.empty:
+            return gdf
+        minx, miny, maxx, maxy = gdf.total_bounds
+        extent = max(maxx - minx, maxy - miny)
+        tolerance = extent / pixels * SIMPLIFY_PIXELS
+        if not tolerance > 0:
+            return gdf
+        simplified = gdf.copy()
+        try:
+            geometry = shapely.coverage_simplify(np.asarray(gdf.geometry.array), tolerance)
+        except (shapely.errors.GEOSException, shapely.errors.UnsupportedGEOSVersionError):
+            # Not a valid coverage (or GEOS < 3.12): simplify each polygon on its own.
+            geometry = gdf.geometry.simplify(tolerance, preserve_topology=True)
+        simplified[gdf.geometry.name] = gpd.GeoSeries(geometry, index=gdf.index, crs=gdf.crs)
+        return simplified
+
+    def export_to_shapefile(self, output_path, driver=None):
+        """
+        Exports dissolved district polygons (if available) to a vector file.
+        The format follows the extension (.gpkg GeoPackage, .parquet GeoParquet, .shp ESRI Shapefile)
+        unless a driver is given; GeoPackage and GeoParquet keep full column names. Without a driver,
+        any other extension raises ValueError rather than writing a file whose name misstates its format.
+        """
+        if driver is None:
+            driver = export_driver(output_path)
+        gdf = self.dissolved_districts()
+        if driver == "Parquet":
+            gdf.to_parquet(output_path, index=False)
+        elif driver == "GPKG":
+            gdf.to_file(output_path, driver=driver, layer="districts", engine="pyogrio")
+        else:
+            if driver == "ESRI Shapefile":
+                gdf = self._shapefile_field_names(gdf)
+            gdf.to_file(output_path, driver=driver, engine="pyogrio")
+        return output_path
+
+    @staticmethod
+    def _shapefile_field_names(gdf) -> gpd.GeoDataFrame:
+        """Shapefile field name limit is 10 chars; shorten to avoid warnings."""
+        taken = set(gdf.columns)
         rename_map = {}
-        for col in list(gdf.columns):
+        for col in gdf.columns:
             if len(col) > 10:
                 short = col[:10]
                 # Ensure uniqueness
                 suffix = 1
-                while short in rename_map.values() or short in gdf.columns:
+                while short in taken:
                     short = f"{col[:7]}{suffix}"
                     suffix += 1
+                taken.add(short)
                 rename_map[col] = short
-        if rename_map:
-            gdf = gdf.rename(columns=rename_map)
-        gdf.to_file(output_path, driver="ESRI Shapefile")
-        return output_path
+        return gdf.rename(columns=rename_map) if rename_map else gdf
@@ -1,27 +1,102 @@
 import concurrent.futures
+import json
 import logging
 import os
 import random
 import shutil
+import tempfile
+import threading
 import time
 import zipfile
-from datetime import datetime
-from typing import Callable, Optional
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Callable, Dict, Optional, Tuple
 
+import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pyogrio
 import requests
+import urllib3
 from census import Census
+from census.core import APIKeyError, CensusException
 
 from ..data.partisan_providers import (
     DEFAULT_PARTISAN_YEAR,
+    DOWNLOAD_CHUNK_SIZE,
     PROVIDER_REGISTRY,
     fetch_scores_for_provider,
 )
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is a drop-in fallback
+    _json_loads = json.loads
+
+# Sidecar holding the Last-Modified header of the TIGER archive a shapefile directory was extracted from.
+LAST_MODIFIED_FILENAME = ".last_modified"
+
+# Census frames most recently read from or written to the on-disk cache, keyed by the cache file's
+# path, mtime and size so a rewritten or deleted file is never served from memory. Block-level
+# frames can be hundreds of MB, hence the small bound.
+CENSUS_FRAME_CACHE_SIZE = 4
+_census_frame_cache: "OrderedDict[Tuple[str, int, int], pd.DataFrame]" = OrderedDict()
+_census_frame_cache_lock = threading.Lock()
+# Geometry paths already resolved (and revalidated) this session, by (state_fips, resolution).
+_resolved_shapefiles: Dict[Tuple[str, str], str] = {}
+
+
+def _census_frame_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _recall_census_frame(path) -> Optional[pd.DataFrame]:
+    """Shallow copy of the cached frame, so callers adding or replacing columns never touch it."""
+    key = _census_frame_key(path)
+    with _census_frame_cache_lock:
+        df = _census_frame_cache.get(key)
+        if df is None:
+            return None
+        _census_frame_cache.move_to_end(key)
+    return df.copy(deep=False)
+
+
+def _remember_census_frame(path, df):
+    key = _census_frame_key(path)
+    if key is None:
+        return
+    with _census_frame_cache_lock:
+        _census_frame_cache[key] = df.copy(deep=False)
+        while len(_census_frame_cache) > CENSUS_FRAME_CACHE_SIZE:
+            _census_frame_cache.popitem(last=False)
+
 
 class DataFetcherWorker:
 
     CENSUS_FIELDS = ('NAME', 'P1_001N', 'P1_003N', 'P1_004N', 'P1_005N', 'P1_006N', 'P1_007N', 'P1_008N')
+    GEOGRAPHY_COLUMNS = ('state', 'county', 'tract', 'block')
+    # Decennial PL endpoint; census' PLClient only switches its endpoint_url to this form inside get().
+    CENSUS_ROWS_URL = "https://api.census.gov/data/{year}/dec/{dataset}"
+    # Census API requests in flight at once; each is dominated by round-trip latency.
+    CENSUS_MAX_CONCURRENCY = 32
+    # (connect, read) seconds for a Census rows request; a stalled connection then fails into the retries.
+    CENSUS_TIMEOUT = (10, 60)
+    # Seconds the TIGER download may wait to connect or between received bytes, as for the partisan downloads.
+    SHAPEFILE_TIMEOUT = 60
+    # Rows converted to Arrow and written per parquet row group when caching.
+    CACHE_ROW_GROUP_SIZE = 200_000
+    # Transient Census failures are retried with exponential backoff (plus jitter) capped here.
+    RETRY_MAX_DELAY = 8.0
+    # Minimum spacing of progress callbacks; each one is a round trip through the UI event queue.
+    PROGRESS_INTERVAL = 0.1
+    # Share of the progress bar per fetch phase; the phases run concurrently, so progress is their weighted sum.
+    PROGRESS_WEIGHTS = {"census": 75, "shapefiles": 25}
 
     def __init__(
         self,
@@ -36,7 +111,10 @@ class DataFetcherWorker:
     ):
         self.state_fips = state_fips
         self.api_key = api_key
-        self.c = Census(self.api_key)
+        session = requests.Session()
+        # One pooled connection per concurrent request, so parallel fetches reuse their connections.
+        session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=self.CENSUS_MAX_CONCURRENCY))
+        self.c = Census(self.api_key, session=session)
         self.election_year = election_year or DEFAULT_PARTISAN_YEAR
         self.provider_keys = provider_keys or ["county_presidential"]
         self.active_provider_meta = None
@@ -45,14 +123,32 @@ class DataFetcherWorker:
         self.progress_callback = progress_callback
         self.finished_callback = finished_callback
         self.error_callback = error_callback
+        self._last_progress = (None, 0.0)
+        self._phase_progress = dict.fromkeys(self.PROGRESS_WEIGHTS, 0.0)
+        self._progress_lock = threading.Lock()
 
     # ------------- event helpers ------------- #
-    def _emit_progress(self, value: int):
-        if self.progress_callback:
-            try:
-                self.progress_callback(int(value))
-            except Exception:
-                pass
+    def _emit_progress(self, value: float, force: bool = False):
+        """Drops repeated values and, unless forced or complete, updates closer than PROGRESS_INTERVAL."""
+        if not self.progress_callback:
+            return
+        value = int(value)
+        now = time.monotonic()
+        last_value, last_time = self._last_progress
+        if value == last_value or (not force and value < 100 and now - last_time < self.PROGRESS_INTERVAL):
+            return
+        self._last_progress = (value, now)
+        try:
+            self.progress_callback(value)
+        except Exception:
+            pass
+
+    def _advance(self, phase: str, fraction: float):
+        """Records how far one fetch phase is (0-1) and reports the combined progress."""
+        with self._progress_lock:
+            self._phase_progress[phase] = fraction
+            value = sum(self.PROGRESS_WEIGHTS[name] * done for name, done in self._phase_progress.items())
+            self._emit_progress(value, force=fraction >= 1)
 
     def _emit_finished(self, census_df, shapefile_path):
         if self.finished_callback:
@@ -77,10 +173,15 @@ class DataFetcherWorker:
 
     def _load_cache(self, state_fips):
         csv_path, parquet_path = self._cache_paths(state_fips)
+        df = _recall_census_frame(parquet_path)
+        if df is not None:
+            self.logger.info(f"Using census data already loaded from {parquet_path}")
+            return df
         if os.path.exists(parquet_path):
             try:
                 df = pd.read_parquet(parquet_path)
                 self.logger.info(f"Loading census data from cache: {parquet_path}")
+                _remember_census_frame(parquet_path, df)
                 return df
             except Exception as exc:
                 self.logger.warning(f"Failed to read parquet cache {parquet_path}: {exc}")
@@ -88,27 +189,83 @@ class DataFetcherWorker:
             try:
                 df = pd.read_csv(csv_path, dtype={'GEOID': str, 'county': str})
                 self.logger.info(f"Loading census data from cache: {csv_path}")
-                return df
             except Exception as exc:
                 self.logger.warning(f"Failed to read CSV cache {csv_path}: {exc}")
+                return None
+            # CSV caches predate the parquet-only format; convert them once.
+            if self._write_parquet_cache(parquet_path, df):
+                os.remove(csv_path)
+                _remember_census_frame(parquet_path, df)
+            return df
         return None
 
+    def _save_cache_in_background(self, state_fips, df):
+        """
+        Writes the cache on its own thread so the frame is returned as soon as it is built.
+        The thread gets a shallow copy (callers' column changes do not reach it) and is not a
+        daemon, so a CLI run still finishes the write before the interpreter exits.
+        """
+        threading.Thread(
+            target=self._save_cache, args=(state_fips, df.copy(deep=False)), name=f"census-cache-{state_fips}"
+        ).start()
+
     def _save_cache(self, state_fips, df):
+        """
+        Caches df as zstd-compressed parquet. CSV is only written when parquet cannot be
+        (no parquet engine installed); a stale CSV mirror is removed.
+        """
         csv_path, parquet_path = self._cache_paths(state_fips)
+        if self._write_parquet_cache(parquet_path, df):
+            if os.path.exists(csv_path):
+                os.remove(csv_path)
+            _remember_census_frame(parquet_path, df)
+            return
         try:
             df.to_csv(csv_path, index=False)
+            self.logger.info(f"Saved census data to cache: {csv_path}")
         except Exception as exc:
             self.logger.warning(f"Failed to write CSV cache {csv_path}: {exc}")
+
+    def _write_parquet_cache(self, parquet_path, df) -> bool:
+        """
+        Writes df in CACHE_ROW_GROUP_SIZE slices through one ParquetWriter, so only a slice is
+        ever converted to Arrow at a time instead of a full copy of the frame. The file is
+        written under a temporary name and moved into place when complete.
+        """
+        # Per-writer name: two workers caching the same state must not interleave into one file.
+        partial_path = f"{parquet_path}.{os.getpid()}.{threading.get_ident()}.part"
         try:
-            df.to_parquet(parquet_path, index=False)
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                df.to_parquet(partial_path, index=False, compression="zstd")
+            else:
+                size = self.CACHE_ROW_GROUP_SIZE
+                schema = pa.Schema.from_pandas(df.iloc[:size], preserve_index=False)
+                with pq.ParquetWriter(partial_path, schema, compression="zstd") as writer:
+                    for start in range(0, max(len(df), 1), size):
+                        chunk = pa.Table.from_pandas(df.iloc[start:start + size], schema=schema, preserve_index=False)
+                        writer.write_table(chunk, row_group_size=size)
+                        del chunk
+            os.replace(partial_path, parquet_path)
         except Exception as exc:
             self.logger.warning(f"Failed to write parquet cache {parquet_path}: {exc}")
-        self.logger.info(f"Saved census data to cache: {csv_path}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return False
+        self.logger.info(f"Saved census data to cache: {parquet_path}")
+        return True
 
     def fetch_data(self):
         try:
-            census_df = self._get_census_data(self.state_fips)
-            shapefile_path = self._get_shapefiles(self.state_fips)
+            # Census rows and TIGER geometries come from different hosts and meet only at the join,
+            # so the high-latency API requests overlap the bulk archive download.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                census_future = executor.submit(self._get_census_data, self.state_fips)
+                shapefile_future = executor.submit(self._get_shapefiles, self.state_fips)
+                census_df = census_future.result()
+                shapefile_path = shapefile_future.result()
 
             if census_df is not None and shapefile_path:
                 self._emit_finished(census_df, shapefile_path)
@@ -134,90 +291,153 @@ class DataFetcherWorker:
             print(f"An error occurred while fetching tracts for county {county_fips}: {e}")
             return None
 
-    def _with_retries(self, func, retries=3, base_delay=1.0):
+    def _with_retries(self, func, retries=4, base_delay=0.5):
         for attempt in range(1, retries + 1):
             try:
                 return func()
             except Exception as exc:
-                if attempt == retries:
+                if attempt == retries or not self._is_retryable(exc):
                     raise
-                delay = base_delay * (2 ** (attempt - 1)) + random.random() * 0.2
+                delay = min(base_delay * (2 ** (attempt - 1)), self.RETRY_MAX_DELAY) + random.uniform(0, base_delay)
                 self.logger.warning(f"Retrying after error: {exc} (attempt {attempt}/{retries})")
                 time.sleep(delay)
 
-    def _fetch_county_data(self, state_fips, county_fips):
-        """Helper to fetch data for a single county (executed in thread)."""
-        county_data = []
-        tracts = self._get_tracts_for_county(state_fips, county_fips)
-        if not tracts:
-            return []
+    @staticmethod
+    def _is_retryable(exc):
+        """
+        Only rate limiting, server errors and connection problems are worth another attempt;
+        a 400 for a bad FIPS code or a rejected key fails the same way every time.
+        """
+        if isinstance(exc, requests.HTTPError):
+            status = exc.response.status_code if exc.response is not None else None
+            return status is None or status == 429 or status >= 500
+        if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if isinstance(exc, APIKeyError):
+            return False
+        if isinstance(exc, CensusException):
+            # census.Client raises this for any non-200 without the status code; the API's own
+            # query errors (the 4xx responses) are plain-text bodies starting with "error:".
+            return not str(exc).lstrip().lower().startswith("error:")
+        return False
 
-        if self.resolution == "tract":
-            try:
-                # Fetch all tracts for county in one go
-                data = self.c.pl.get(self.CENSUS_FIELDS,
-                                     {'for': 'tract:*', 'in': f'state:{state_fips} county:{county_fips}'})
-                county_data.extend(data)
-            except Exception as e:
-                self.logger.warning(f"Tract fetch failed for county {county_fips}: {e}")
+    def _fetch_units(self, state_fips, county_fips, tract_fips=None):
+        """One Census request: every tract of a county, or every block of one tract."""
+        if tract_fips is None:
+            params = {'for': 'tract:*', 'in': f'state:{state_fips} county:{county_fips}'}
         else:
-            # Block resolution: iterate tracts
-            for tract_fips in tracts:
-                try:
-                    data = self.c.pl.get(self.CENSUS_FIELDS, {'for': 'block:*',
-                                                              'in': f'state:{state_fips} county:{county_fips} tract:{tract_fips}'})
-                    county_data.extend(data)
-                except Exception as e:
-                    self.logger.warning(f"Block fetch failed for tract {tract_fips} county {county_fips}: {e}")
-        return county_data
+            params = {'for': 'block:*', 'in': f'state:{state_fips} county:{county_fips} tract:{tract_fips}'}
+        try:
+            return self._with_retries(lambda: self._census_rows(params))
+        except Exception as e:
+            unit = f"tract {tract_fips} county {county_fips}" if tract_fips else f"county {county_fips}"
+            self.logger.warning(f"{self.resolution.capitalize()} fetch failed for {unit}: {e}")
+            return []
+
+    def _fetch_county_blocks(self, state_fips, county_fips):
+        """Every block of a county in one request (tract:*); None if the API refused it."""
+        params = {'for': 'block:*', 'in': f'state:{state_fips} county:{county_fips} tract:*'}
+        try:
+            return self._with_retries(lambda: self._census_rows(params))
+        except Exception as e:
+            self.logger.warning(f"County-wide block fetch failed for county {county_fips}, fetching per tract: {e}")
+            return None
+
+    def _census_rows(self, params):
+        """
+        CENSUS_FIELDS for one geography request as the API's raw JSON rows (header dropped).
+        Unlike census' Client.get this builds no per-row dicts and casts no cells in Python;
+        the numeric columns are converted once on the assembled frame.
+        """
+        pl = self.c.pl
+        response = self.c.session.get(
+            self.CENSUS_ROWS_URL.format(year=pl.default_year, dataset=pl.dataset),
+            params={'get': ",".join(self.CENSUS_FIELDS), 'key': self.api_key, **params},
+            timeout=self.CENSUS_TIMEOUT,
+        )
+        if response.status_code == 204:
+            return []
+        response.raise_for_status()
+        return _json_loads(response.content)[1:]
 
     def _get_census_data(self, state_fips):
         cached_df = self._load_cache(state_fips)
         if cached_df is not None:
+            self._advance("census", 1.0)
             if 'partisan_score' not in cached_df.columns:
-                cached_df = self._attach_partisan_scores(cached_df, state_fips)
-                self._save_cache(state_fips, cached_df)
+                cached_df = self._compact_geography(self._attach_partisan_scores(cached_df, state_fips))
+                self._save_cache_in_background(state_fips, cached_df)
             return cached_df
 
         counties = self._get_counties_for_state(state_fips)
         if not counties:
             return None
 
-        all_census_data = []
+        # Every request goes through one bounded pool. At block resolution each county is one
+        # tract:* request; only if that fails is the county's tract list fetched and its blocks
+        # requested tract by tract. Census API is I/O bound, so threads work well even with the GIL.
         num_counties = len(counties)
-        
-        # Use ThreadPoolExecutor for parallel fetching
-        # Census API is I/O bound, so threads work well even with GIL.
-        # With free-threading, this scales even better.
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_county = {
-                executor.submit(self._fetch_county_data, state_fips, county_fips): county_fips 
-                for county_fips in counties
-            }
-            
-            completed_count = 0
-            for future in concurrent.futures.as_completed(future_to_county):
-                county_fips = future_to_county[future]
-                try:
-                    data = future.result()
-                    if data:
-                        all_census_data.extend(data)
-                except Exception as exc:
-                    self.logger.error(f"County {county_fips} fetch generated an exception: {exc}")
-                
-                completed_count += 1
-                self._emit_progress(int((completed_count / num_counties) * 75))
+        county_results = {}
+        pending = {}
+        completed_count = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.CENSUS_MAX_CONCURRENCY) as executor:
+            fetch_county = self._fetch_units if self.resolution == "tract" else self._fetch_county_blocks
+            futures = {executor.submit(fetch_county, state_fips, county_fips): (county_fips, 0)
+                       for county_fips in counties}
+            while futures:
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    county_fips, slot = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        self.logger.error(f"County {county_fips} fetch generated an exception: {exc}")
+                        result = []
+                    if result is None and slot == 0:
+                        # The county-wide block request failed; fall back to its tract list.
+                        futures[executor.submit(self._get_tracts_for_county, state_fips, county_fips)] = (
+                            county_fips, None)
+                        continue
+                    result = result or []
+                    if slot is None:
+                        # A county's tract list arrived; queue one block request per tract.
+                        county_results[county_fips] = [None] * len(result)
+                        pending[county_fips] = len(result)
+                        for index, tract_fips in enumerate(result):
+                            futures[executor.submit(self._fetch_units, state_fips, county_fips, tract_fips)] = (
+                                county_fips, index)
+                    else:
+                        county_results.setdefault(county_fips, [None])[slot] = result
+                        pending[county_fips] = pending.get(county_fips, 1) - 1
+                    if pending[county_fips] == 0:
+                        completed_count += 1
+                        self._advance("census", completed_count / num_counties)
+
+        # Assemble in county/tract order so the result does not depend on completion order.
+        all_census_data = [
+            row
+            for county_fips in counties
+            for unit_rows in county_results.get(county_fips, ())
+            for row in unit_rows or ()
+        ]
 
         if not all_census_data:
             return None
 
-        df = pd.DataFrame(all_census_data)
+        # The API returns the requested fields followed by the geography hierarchy.
+        geo_columns = ['state', 'county', 'tract'] if self.resolution == "tract" else ['state', 'county', 'tract', 'block']
+        df = pd.DataFrame(all_census_data, columns=[*self.CENSUS_FIELDS, *geo_columns])
+        del all_census_data, county_results
+        for field in self.CENSUS_FIELDS[1:]:
+            # Counts fit int32 (half of float64); a column with unparseable cells stays float64 (NaN).
+            values = pd.to_numeric(df[field], errors='coerce')
+            df[field] = values.astype('int32') if values.notna().all() else values.astype('float64')
         if self.resolution == "tract":
             df['GEOID'] = df['state'] + df['county'] + df['tract']
         else:
             df['GEOID'] = df['state'] + df['county'] + df['tract'] + df['block']
-        df = self._attach_partisan_scores(df, state_fips)
-        self._save_cache(state_fips, df)
+        df = self._compact_geography(self._attach_partisan_scores(df, state_fips))
+        self._save_cache_in_background(state_fips, df)
         return df
 
     def _attach_partisan_scores(self, df, state_fips):
@@ -230,17 +450,30 @@ class DataFetcherWorker:
                 county_scores = fetch_scores_for_provider(provider_meta, state_fips, self.election_year)
                 if county_scores is None or county_scores.empty:
                     continue
-                df['county'] = df['county'].astype(str).str.zfill(3)
+                # Keys are factorized once; zero-padding and the score lookup then run per distinct
+                # county (or county/tract pair) instead of per row, and no merged frame is built.
+                county_codes, counties = self._padded_codes(df['county'], 3)
+                df['county'] = counties.take(county_codes)
                 if 'tract' in county_scores.columns:
                     # higher resolution partisan data
-                    df['tract'] = df.get('tract', '').astype(str).str.zfill(6)
-                    county_scores['tract'] = county_scores['tract'].astype(str).str.zfill(6)
-                    df = df.merge(county_scores, on=['county', 'tract'], how='left')
+                    tract_codes, tracts = self._padded_codes(df.get('tract', ''), 6)
+                    df['tract'] = tracts.take(tract_codes)
+                    pair_codes, pairs = pd.factorize(county_codes.astype(np.int64) * len(tracts) + tract_codes)
+                    unit_keys = pd.MultiIndex.from_arrays(
+                        [counties.take(pairs // len(tracts)), tracts.take(pairs % len(tracts))]
+                    )
+                    unit_codes = pair_codes
+                    keys = ['county', 'tract']
+                    scores = county_scores.assign(tract=county_scores['tract'].astype(str).str.zfill(6))
                 else:
-                    df = df.merge(county_scores, on='county', how='left')
+                    unit_keys, unit_codes = counties, county_codes
+                    keys = ['county']
+                    scores = county_scores
+                scores = scores.drop_duplicates(subset=keys).set_index(keys)['partisan_score']
                 fallback = county_scores['partisan_score'].mean()
                 fallback = 0.5 if pd.isna(fallback) else fallback
-                df['partisan_score'] = df['partisan_score'].fillna(fallback)
+                unit_scores = scores.reindex(unit_keys).fillna(fallback).to_numpy(dtype=np.float64)
+                df['partisan_score'] = unit_scores[unit_codes]
                 self.active_provider_meta = provider_meta
                 self.logger.info(f"Attached partisan data from provider '{provider_meta.key}' ({provider_meta.label})")
                 return df
@@ -252,7 +485,89 @@ class DataFetcherWorker:
             df['partisan_score'] = 0.5
             return df
 
+    @classmethod
+    def _compact_geography(cls, df):
+        """
+        Stores the geography code columns as categoricals: a handful of distinct codes repeated on
+        every row. Done after GEOID and the partisan join, which need them as strings. NAME is left
+        as is: it spells out the full geography, so every row is distinct and a categorical would only
+        add a codes array.
+        """
+        for column in cls.GEOGRAPHY_COLUMNS:
+            if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype('category')
+        return df
+
+    @staticmethod
+    def _padded_codes(values, width):
+        """Factorized values plus their distinct values as zero-padded strings (as astype(str).str.zfill)."""
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        return codes, pd.Index(uniques).astype(str).str.zfill(width)
+
     def _get_shapefiles(self, state_fips):
+        """
+        Return a path to the unit geometries, preferring a GeoParquet copy of the shapefile.
+        Within a session a state is revalidated against TIGER only once.
+        """
+        key = (state_fips, self.resolution)
+        resolved = _resolved_shapefiles.get(key)
+        if resolved and os.path.exists(resolved):
+            self._advance("shapefiles", 1.0)
+            return resolved
+        shapefile_path = self._download_shapefiles(state_fips)
+        if not shapefile_path:
+            return shapefile_path
+        resolved = self._shapefile_as_parquet(shapefile_path)
+        _resolved_shapefiles[key] = resolved
+        return resolved
+
+    def _shapefile_as_parquet(self, shapefile_path):
+        parquet_path = os.path.splitext(shapefile_path)[0] + ".parquet"
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(shapefile_path):
+            return parquet_path
+        try:
+            read_unit_geometries(shapefile_path).to_parquet(parquet_path, index=False)
+            self.logger.info(f"Saved shapefile as GeoParquet: {parquet_path}")
+            return parquet_path
+        except Exception as exc:
+            self.logger.warning(f"Failed to write GeoParquet copy of {shapefile_path}: {exc}")
+            return shapefile_path
+
+    def _copy_download(self, response, outfile):
+        """
+        Streams the response body into outfile one chunk at a time. When the size is known up front
+        (Content-Length of an unencoded body) the shapefile phase's progress advances with it.
+        """
+        response.raw.decode_content = True
+        expected = response.headers.get('Content-Length')
+        total = int(expected) if expected and 'Content-Encoding' not in response.headers else 0
+        received = 0
+        while chunk := response.raw.read(DOWNLOAD_CHUNK_SIZE):
+            outfile.write(chunk)
+            if total:
+                received += len(chunk)
+                self._advance("shapefiles", min(received / total, 0.99))
+
+    @staticmethod
+    def _extract_archive(zip_ref, target_dir):
+        """
+        Extracts the archive's top-level files in parallel: zlib releases the GIL while inflating and
+        zipfile serializes the reads on its shared handle, so one ZipFile can feed every thread.
+        Nested members go first, serially, so no two threads race to create the same directory.
+        """
+        members = zip_ref.infolist()
+        flat = [member for member in members if not member.is_dir() and "/" not in member.filename]
+        workers = min(len(flat), os.cpu_count() or 1)
+        if workers <= 1:
+            zip_ref.extractall(target_dir)
+            return
+        for member in members:
+            if member.is_dir() or "/" in member.filename:
+                zip_ref.extract(member, target_dir)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda member: zip_ref.extract(member, target_dir), flat))
+
+    def _download_shapefiles(self, state_fips):
         cache_dir = ".cache"
         suffix = "tract" if self.resolution == "tract" else "tabblock20"
         base_folder = "TRACT" if self.resolution == "tract" else "TABBLOCK20"
@@ -263,52 +578,114 @@ class DataFetcherWorker:
         filename = f"{shapefile_base}.zip"
         url = f"{base_url}{filename}"
 
-        if os.path.exists(shapefile_dir):
+        # The Last-Modified of the archive we extracted is kept next to it, so a cached copy costs
+        # one conditional GET (304, no body) instead of a HEAD plus a date comparison.
+        last_modified_path = os.path.join(shapefile_dir, LAST_MODIFIED_FILENAME)
+        headers = {}
+        if os.path.exists(shapefile_path):
             try:
-                response = requests.head(url)
-                response.raise_for_status()
-                last_modified_header = response.headers.get('Last-Modified')
-                if last_modified_header:
-                    remote_last_modified = datetime.strptime(last_modified_header, '%a, %d %b %Y %H:%M:%S %Z')
-                    local_last_modified = datetime.fromtimestamp(os.path.getmtime(shapefile_dir))
-                    if remote_last_modified > local_last_modified:
-                        self.logger.info("Remote shapefile is newer. Re-downloading...")
-                        shutil.rmtree(shapefile_dir)
-                    elif os.path.exists(shapefile_path):
-                        self.logger.info(f"Using cached shapefile directory: {shapefile_dir}")
-                self._emit_progress(100)
-                return shapefile_path
-            except requests.RequestException as e:
-                self.logger.warning(f"Could not check for newer shapefile, using cache. Error: {e}")
-                if os.path.exists(shapefile_path):
-                    self._emit_progress(100)
-                    return shapefile_path
-                # Cache directory exists but shapefile is missing; fall through to re-download.
+                with open(last_modified_path, "r") as fp:
+                    headers["If-Modified-Since"] = fp.read().strip()
+            except OSError:
+                # Caches extracted before the sidecar existed: the directory mtime is the download time.
+                headers["If-Modified-Since"] = formatdate(os.path.getmtime(shapefile_dir), usegmt=True)
 
         try:
-            self.logger.info(f"Downloading shapefile from {url}")
-            response = self.c.session.get(url)
-            response.raise_for_status()
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            with zipfile.ZipFile(filename, 'r') as zip_ref:
-                zip_ref.extractall(shapefile_dir)
-            os.remove(filename)
-            os.utime(shapefile_dir, None)
+            # Anonymous temp file (O_TMPFILE on Linux): nothing to clean up and nothing left in the CWD.
+            # The archive is streamed into it rather than held in memory as response.content.
+            with self.c.session.get(url, stream=True, headers=headers, timeout=self.SHAPEFILE_TIMEOUT) as response, \
+                    tempfile.TemporaryFile() as archive:
+                if response.status_code == 304:
+                    self.logger.info(f"Using cached shapefile directory: {shapefile_dir}")
+                    self._advance("shapefiles", 1.0)
+                    return shapefile_path
+                response.raise_for_status()
+                self.logger.info(f"Downloading shapefile from {url}")
+                self._copy_download(response, archive)
+                # Extract beside the cache and swap it in, so an interrupted extraction never leaves
+                # a partial directory that a later 304 would accept as current.
+                os.makedirs(cache_dir, exist_ok=True)
+                staging_dir = tempfile.mkdtemp(prefix=f"{os.path.basename(shapefile_dir)}.", dir=cache_dir)
+                try:
+                    with zipfile.ZipFile(archive, 'r') as zip_ref:
+                        self._extract_archive(zip_ref, staging_dir)
+                    if os.path.exists(shapefile_dir):
+                        shutil.rmtree(shapefile_dir)
+                    os.replace(staging_dir, shapefile_dir)
+                finally:
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                last_modified = response.headers.get('Last-Modified')
+            if last_modified:
+                with open(last_modified_path, "w") as fp:
+                    fp.write(last_modified)
             if not os.path.exists(shapefile_path):
                 # Fall back to first .shp in the directory if naming changes.
                 candidates = [file for file in os.listdir(shapefile_dir) if file.lower().endswith(".shp")]
                 if candidates:
                     shapefile_path = os.path.join(shapefile_dir, candidates[0])
             if os.path.exists(shapefile_path):
-                self._emit_progress(100)
+                self._advance("shapefiles", 1.0)
                 return shapefile_path
             self.logger.error("Extracted shapefile missing .shp file.")
-            self._emit_progress(100)
+            self._advance("shapefiles", 1.0)
             return None
-        except Exception as e:
+        except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+            # urllib3 errors come from reading the raw body stream, e.g. a read timeout mid-download.
+            if os.path.exists(shapefile_path):
+                self.logger.warning(f"Could not check for newer shapefile, using cache. Error: {e}")
+                self._advance("shapefiles", 1.0)
+                return shapefile_path
             self.logger.error(f"An error occurred while downloading the shapefile: {e}")
             return None
         except zipfile.BadZipFile:
             self.logger.error("Error: The downloaded file is not a valid zip file.")
             return None
+        except Exception as e:
+            self.logger.error(f"An error occurred while downloading the shapefile: {e}")
+            return None
+
+
+GEOID_FIELDS = ("GEOID", "GEOID20")
+COUNTY_FIELDS = ("COUNTYFP", "COUNTYFP20")
+
+
+def read_unit_geometries(path, counties=None) -> gpd.GeoDataFrame:
+    """
+    Read unit geometries returned by DataFetcherWorker (GeoParquet or shapefile).
+    Shapefiles are read through pyogrio and only the GEOID/county fields are materialized.
+    When counties (3-digit FIPS) is given, rows outside them are filtered at read time.
+    """
+    county_list = sorted({str(c).zfill(3) for c in counties}) if counties is not None else None
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        names = set(pq.read_schema(path).names)
+        county_col = next((name for name in COUNTY_FIELDS if name in names), None)
+        if county_list is None or county_col is None:
+            return gpd.read_parquet(path)
+        return gpd.read_parquet(path, filters=[(county_col, "in", county_list)])
+    fields = set(pyogrio.read_info(path)["fields"])
+    columns = [name for name in GEOID_FIELDS + COUNTY_FIELDS if name in fields]
+    county_col = next((name for name in COUNTY_FIELDS if name in fields), None)
+    where = None
+    if county_list is not None and county_col is not None:
+        where = f"{county_col} IN ({', '.join(repr(c) for c in county_list)})"
+    return gpd.read_file(path, engine="pyogrio", columns=columns or None, where=where)
+
+
+def join_on_geoid(state_gdf: gpd.GeoDataFrame, census_df: pd.DataFrame) -> gpd.GeoDataFrame:
+    """
+    Inner-join census attributes onto unit geometries by GEOID, keeping geometry row order.
+    Builds one hash index over the census GEOIDs and gathers rows by position; falls back to
+    DataFrame.merge when census GEOIDs are not unique. Census columns whose names already exist
+    on the geometry side are not duplicated.
+    """
+    census_index = pd.Index(census_df["GEOID"])
+    if not census_index.is_unique:
+        return state_gdf.merge(census_df, on="GEOID")
+    positions = census_index.get_indexer(state_gdf["GEOID"])
+    matched = positions >= 0
+    left = state_gdf.loc[matched].reset_index(drop=True)
+    right_cols = [col for col in census_df.columns if col != "GEOID" and col not in left.columns]
+    right = census_df[right_cols].iloc[positions[matched]].reset_index(drop=True)
+    return pd.concat([left, right], axis=1)
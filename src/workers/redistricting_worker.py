@@ -1,5 +1,7 @@
 from typing import Callable, Optional
 
+import pandas as pd
+
 from ..core.redistricting_algorithms import RedistrictingAlgorithm
 
 
@@ -54,15 +56,19 @@ class RedistrictingWorker:
             coi_list = None
             if self.communities_of_interest:
                 try:
-                    import pandas as pd
-                    coi_df = pd.read_csv(self.communities_of_interest, dtype=str)
+                    geoid_candidates = ("GEOID", "geoid", "geoid20", "GEOID20")
+                    coi_df = pd.read_csv(
+                        self.communities_of_interest, dtype=str, usecols=lambda col: col in geoid_candidates
+                    )
                     geoid_col = None
-                    for candidate in ("GEOID", "geoid", "geoid20", "GEOID20"):
+                    for candidate in geoid_candidates:
                         if candidate in coi_df.columns:
                             geoid_col = candidate
                             break
                     if geoid_col:
-                        coi_list = coi_df[geoid_col].astype(str).str.zfill(15).tolist()
+                        # Vectorized left-pad (GEOIDs carry no sign, so this is zfill); duplicates dropped.
+                        geoids = coi_df[geoid_col].dropna().str.pad(15, side="left", fillchar="0")
+                        coi_list = geoids.unique().tolist()
                 except Exception:
                     coi_list = None
             
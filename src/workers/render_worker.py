@@ -0,0 +1,35 @@
+from typing import Callable, Optional
+
+from ..rendering.map_generator import MapGenerator
+
+
+class RenderWorker:
+    def __init__(
+        self,
+        map_generator: MapGenerator,
+        finished_callback: Optional[Callable[[bytes], None]] = None,
+        error_callback: Optional[Callable[[str], None]] = None,
+    ):
+        self.map_generator = map_generator
+        self.finished_callback = finished_callback
+        self.error_callback = error_callback
+
+    def _emit_finished(self, png: bytes):
+        if self.finished_callback:
+            try:
+                self.finished_callback(png)
+            except Exception:
+                pass
+
+    def _emit_error(self, message: str):
+        if self.error_callback:
+            try:
+                self.error_callback(message)
+            except Exception:
+                pass
+
+    def run(self):
+        try:
+            self._emit_finished(self.map_generator.render_png())
+        except Exception as e:
+            self._emit_error(str(e))
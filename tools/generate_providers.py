@@ -5,8 +5,9 @@ import hashlib
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import requests
 import yaml
@@ -18,8 +19,14 @@ CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 ORG = "openelections"
 TARGET_YEARS = [2022]
+# GitHub requests in flight at once; discovery is dominated by round trips, not CPU.
+MAX_CONCURRENT_REQUESTS = 16
+# Only the header row is inspected; the full file is streamed once for its hash/size.
+HEADER_PROBE_BYTES = 16 * 1024
+HASH_CHUNK_SIZE = 64 * 1024
 
 SESSION = requests.Session()
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS))
 TOKEN = os.getenv("GITHUB_TOKEN")
 if TOKEN:
     SESSION.headers.update({"Authorization": f"Bearer {TOKEN}"})
@@ -33,21 +40,68 @@ def load_metadata() -> List[Dict]:
 def save_metadata(data: List[Dict]):
     with open(METADATA_PATH, "w") as fp:
         yaml.safe_dump(data, fp, sort_keys=False)
-def download_metadata(url: str):
+def probe_cache_path(url: str) -> Path:
+    return CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+
+def load_probe(url: str) -> Optional[Dict]:
     try:
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
+        with open(probe_cache_path(url), "r") as fp:
+            cached = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    return cached if cached.get("url") == url else None
+
+
+def save_probe(url: str, validators: Dict, metadata: Optional[Dict]):
+    """Rejected files are cached too (metadata None) so they are not re-probed either."""
+    if not validators:
+        return
+    with open(probe_cache_path(url), "w") as fp:
+        json.dump({"url": url, **validators, "metadata": metadata}, fp)
+
+
+def read_header(url: str, conditional_headers: Dict):
+    """
+    Fetches the first HEADER_PROBE_BYTES (servers ignoring Range are cut off there too).
+    Returns (status, header row, validators); a 304 carries no header.
+    """
+    try:
+        with SESSION.get(url, headers={"Range": f"bytes=0-{HEADER_PROBE_BYTES - 1}", **conditional_headers},
+                         stream=True, timeout=30) as resp:
+            resp.raise_for_status()
+            if resp.status_code == 304:
+                return resp.status_code, None, {}
+            validators = {key: resp.headers[name] for key, name in
+                          (("etag", "ETag"), ("last_modified", "Last-Modified")) if name in resp.headers}
+            head = b""
+            for chunk in resp.iter_content(HEADER_PROBE_BYTES):
+                head += chunk
+                if b"\n" in head or len(head) >= HEADER_PROBE_BYTES:
+                    break
     except requests.RequestException:
         return None
-    data = resp.content
-    hasher = hashlib.sha256(data)
-    size = len(data)
-    text = data.decode("utf-8", errors="ignore")
-    reader = csv.reader(text.splitlines())
+    line = head.split(b"\n", 1)[0].decode("utf-8", errors="ignore")
+    return resp.status_code, next(csv.reader([line]), None), validators
+
+
+def hash_file(url: str):
+    """Streams the file through SHA-256 without holding the body in memory."""
+    hasher = hashlib.sha256()
+    size = 0
     try:
-        header = next(reader)
-    except StopIteration:
+        with SESSION.get(url, stream=True, timeout=30) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(HASH_CHUNK_SIZE):
+                hasher.update(chunk)
+                size += len(chunk)
+    except requests.RequestException:
         return None
+    return hasher.hexdigest(), size
+
+
+def header_fields(header: List[str]):
+    """Returns (county_field, party_field, vote_fields) or None if the header is not usable."""
     header_lower = [h.strip().lower() for h in header]
     county_field = None
     for candidate in ("county", "county_name", "county_label"):
@@ -70,13 +124,40 @@ def download_metadata(url: str):
         vote_fields = [col for col in header if col.lower().endswith("_votes")]
     if not vote_fields:
         return None
-    return {
-        "file_hash": hasher.hexdigest(),
-        "file_size": size,
-        "county_field": county_field,
-        "party_field": party_field,
-        "vote_fields": vote_fields,
-    }
+    return county_field, party_field, vote_fields
+
+
+def download_metadata(url: str):
+    """Reuses the cached probe when the file is unchanged upstream (ETag / Last-Modified)."""
+    cached = load_probe(url)
+    conditional_headers = {}
+    if cached and cached.get("etag"):
+        conditional_headers["If-None-Match"] = cached["etag"]
+    elif cached and cached.get("last_modified"):
+        conditional_headers["If-Modified-Since"] = cached["last_modified"]
+    probe = read_header(url, conditional_headers)
+    if probe is None:
+        return None
+    status, header, validators = probe
+    if status == 304:
+        return cached["metadata"]
+    fields = header_fields(header) if header else None
+    metadata = None
+    if fields:
+        digest = hash_file(url)
+        if not digest:
+            return None
+        county_field, party_field, vote_fields = fields
+        file_hash, size = digest
+        metadata = {
+            "file_hash": file_hash,
+            "file_size": size,
+            "county_field": county_field,
+            "party_field": party_field,
+            "vote_fields": vote_fields,
+        }
+    save_probe(url, validators, metadata)
+    return metadata
 
 
 def list_repos(session):
@@ -98,57 +179,65 @@ def list_repos(session):
         url = resp.links.get("next", {}).get("url")
 
 
-def discover_openelections() -> List[Dict]:
+def list_year_files(owner: str, repo: str, state_abbr: str, year: int) -> List[Dict]:
+    api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{year}"
+    try:
+        resp = SESSION.get(api_url, timeout=15)
+        if resp.status_code == 404:
+            return []
+        if resp.status_code == 403:
+            raise RuntimeError("GitHub rate limit exceeded. Set GITHUB_TOKEN.")
+        resp.raise_for_status()
+    except requests.RequestException:
+        return []
     entries = []
-    repo_list = list(list_repos(SESSION))
-    for owner, repo, state_abbr in repo_list:
-        for year in TARGET_YEARS:
-            api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{year}"
-            try:
-                resp = SESSION.get(api_url, timeout=15)
-                if resp.status_code == 404:
-                    continue
-                if resp.status_code == 403:
-                    raise RuntimeError("GitHub rate limit exceeded. Set GITHUB_TOKEN.")
-                resp.raise_for_status()
-            except requests.RequestException:
-                continue
-            for item in resp.json():
-                name = item.get("name", "")
-                if not name.endswith(".csv"):
-                    continue
-                match = re.match(r"(\\d{8})__([a-z]{2})__([a-z0-9_]+)__([a-z0-9_]+)\.csv", name)
-                if not match:
-                    continue
-                _, state, contest_type, granularity = match.groups()
-                if state.upper() != state_abbr:
-                    continue
-                url = item.get("download_url")
-                entry = {
-                    "state": state_abbr,
-                    "contest": contest_type.replace("_", " ").title(),
-                    "year": year,
-                    "granularity": "precinct" if granularity == "precinct" else granularity,
-                    "confidence": "Medium",
-                    "url": url,
-                    "format": "csv",
-                    "parser": "precinct_csv" if granularity == "precinct" else "county_csv",
-                    "dem_token": "DEM",
-                    "gop_token": "REP",
-                }
-                entries.append(entry)
+    for item in resp.json():
+        name = item.get("name", "")
+        if not name.endswith(".csv"):
+            continue
+        match = re.match(r"(\\d{8})__([a-z]{2})__([a-z0-9_]+)__([a-z0-9_]+)\.csv", name)
+        if not match:
+            continue
+        _, state, contest_type, granularity = match.groups()
+        if state.upper() != state_abbr:
+            continue
+        url = item.get("download_url")
+        entry = {
+            "state": state_abbr,
+            "contest": contest_type.replace("_", " ").title(),
+            "year": year,
+            "granularity": "precinct" if granularity == "precinct" else granularity,
+            "confidence": "Medium",
+            "url": url,
+            "format": "csv",
+            "parser": "precinct_csv" if granularity == "precinct" else "county_csv",
+            "dem_token": "DEM",
+            "gop_token": "REP",
+        }
+        entries.append(entry)
     return entries
 
 
+def discover_openelections() -> List[Dict]:
+    """Lists every repo/year directory concurrently; entries keep repo/year order."""
+    jobs = [(owner, repo, state_abbr, year)
+            for owner, repo, state_abbr in list_repos(SESSION)
+            for year in TARGET_YEARS]
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        listings = executor.map(lambda job: list_year_files(*job), jobs)
+        return [entry for entries in listings for entry in entries]
+
+
 def main():
     existing = load_metadata()
     lookup = {(item["state"], item["contest"], item.get("year")): item for item in existing}
 
     discovered = discover_openelections()
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        downloaded = list(executor.map(download_metadata, [src["url"] for src in discovered]))
     added = 0
-    for src in discovered:
+    for src, metadata in zip(discovered, downloaded):
         key = (src["state"], src["contest"], src.get("year"))
-        metadata = download_metadata(src["url"])
         if not metadata:
             continue
         entry = {